@@ -7,22 +7,41 @@
 # - CSS and styling have been kept minimal and functional
 # =============================================================================
 
+import base64
+import bisect
+import html
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
 import streamlit as st
 import pandas as pd
+import numpy as np
 import pymongo
 import requests
+import bson
+from bson import ObjectId
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from data_sync import DataWatcher, GameSync, Snapshot, freeze
+from team_stats import (
+    compute_team_stats, game_objective_rows, game_side, mongo_truthy, team_stats_from_result, team_stats_pipeline,
+)
 
 # Determine page icon - use logo if available, otherwise emoji
 page_icon = "🎮"  # Default fallback
-try:
-    import os
-    if os.path.exists("logo.png"):
-        page_icon = "logo.png"
-except:
-    pass
+if os.path.exists("logo.png"):
+    page_icon = "logo.png"
 
 # Page configuration
 st.set_page_config(
@@ -36,6 +55,15 @@ st.set_page_config(
 if "authenticated" not in st.session_state:
     st.session_state.authenticated = False
 
+# Logo for the login page and sidebar header, encoded once per process
+@st.cache_data(show_spinner=False)
+def load_logo_base64(path="logo.png"):
+    try:
+        with open(path, "rb") as f:
+            return base64.b64encode(f.read()).decode()
+    except OSError:
+        return ""
+
 # Authentication function
 def check_password():
     """Returns True if password is correct"""
@@ -45,7 +73,12 @@ def check_password():
     
     def password_entered():
         """Checks whether a password entered by the user is correct."""
-        if st.session_state["password"] == st.secrets["auth"]["password"]:
+        admin_password = st.secrets["auth"].get("admin_password")
+        if admin_password and st.session_state["password"] == admin_password:
+            st.session_state["authenticated"] = True
+            st.session_state["is_admin"] = True
+            del st.session_state["password"]  # Don't store password
+        elif st.session_state["password"] == st.secrets["auth"]["password"]:
             st.session_state["authenticated"] = True
             del st.session_state["password"]  # Don't store password
         else:
@@ -131,12 +164,7 @@ def check_password():
     """, unsafe_allow_html=True)
 
     # Load logo
-    logo_base64 = ""
-    try:
-        if __import__('os').path.exists("logo.png"):
-            logo_base64 = __import__('base64').b64encode(open("logo.png", "rb").read()).decode()
-    except:
-        pass
+    logo_base64 = load_logo_base64()
 
     # Login form
     with st.container():
@@ -179,6 +207,8 @@ def check_password():
 if not check_password():
     st.stop()
 
+render_started = time.perf_counter()
+
 # Modern CSS for contemporary aesthetics (with reduced hover effects)
 st.markdown("""
 <style>
@@ -472,6 +502,39 @@ st.markdown("""
         min-width: 80px;
     }
     
+    /* Scoreboard and draft strip, each rendered as a single HTML block */
+    .scoreboard {
+        display: grid;
+        grid-template-columns: 1fr 1fr;
+        gap: 1.5rem;
+    }
+    
+    .draft-strip {
+        display: flex;
+        justify-content: space-between;
+        gap: 0.5rem;
+    }
+    
+    .draft-pick {
+        flex: 1;
+        display: flex;
+        flex-direction: column;
+        align-items: center;
+    }
+    
+    .draft-placeholder {
+        height: 60px;
+        width: 60px;
+        background: linear-gradient(135deg, var(--bg-card), var(--bg-secondary));
+        border-radius: 8px;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        border: 2px solid var(--border);
+        color: white;
+        font-size: 1.2rem;
+    }
+    
     .items-section {
         display: flex;
         align-items: center;
@@ -564,67 +627,1537 @@ def styled_metric(label, value, delta=None, delta_color="normal"):
     html += "</div>"
     return st.markdown(html, unsafe_allow_html=True)
 
-# Connect to MongoDB Atlas
+# Queries slower than this (ms) go to the slow-query log unless overridden in secrets
+SLOW_QUERY_MS = 500
+SLOW_QUERY_LOG = os.path.join(".cache", "slow_queries.log")
+
+class QueryStats:
+    """Per-process record of database queries and loader cache hits for the admin panel"""
+
+    def __init__(self, slow_query_ms, log_path, measure_bytes=False):
+        self.slow_query_ms = slow_query_ms
+        self.measure_bytes = measure_bytes
+        self.queries = deque(maxlen=500)
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.slow_log = logging.getLogger("gmb.slow_queries")
+        if not self.slow_log.handlers:
+            try:
+                os.makedirs(os.path.dirname(log_path), exist_ok=True)
+                handler = logging.FileHandler(log_path)
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                self.slow_log.addHandler(handler)
+            except OSError:
+                self.slow_log.addHandler(logging.StreamHandler())
+            self.slow_log.setLevel(logging.WARNING)
+            self.slow_log.propagate = False
+
+    def doc_size(self, doc):
+        """BSON size of a returned document, or None unless byte measurement is switched on"""
+        if not self.measure_bytes or doc is None:
+            return None
+        return len(bson.encode(doc))
+
+    def record_query(self, collection, operation, query, started, docs, size):
+        latency_ms = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.queries.append({
+                "collection": collection,
+                "operation": operation,
+                "latency_ms": latency_ms,
+                "docs": docs,
+                "bytes": size,
+                "thread": threading.current_thread().name,
+            })
+        if latency_ms >= self.slow_query_ms:
+            self.slow_log.warning("%s.%s %.0f ms, %d docs, %s bytes, query=%r",
+                                  collection, operation, latency_ms, docs, "?" if size is None else size, query)
+
+    def record_cache(self, loader, hit):
+        with self.lock:
+            counts = self.cache.setdefault(loader, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] += 1
+        if not hit:
+            self.local.__dict__.setdefault("misses", set()).add(loader)
+
+    def record_load(self, loader, load):
+        """Run a cached loader, counting a hit unless the call recorded its own miss on this thread"""
+        misses = self.local.__dict__.setdefault("misses", set())
+        misses.discard(loader)
+        result = load()
+        if loader in misses:
+            misses.discard(loader)
+        else:
+            self.record_cache(loader, hit=True)
+        return result
+
+    def summary(self):
+        with self.lock:
+            queries = pd.DataFrame(list(self.queries), columns=["collection", "operation", "latency_ms", "docs", "bytes", "thread"])
+            cache = dict(self.cache)
+        by_query = queries.groupby(["collection", "operation"]).agg(
+            calls=("latency_ms", "size"),
+            avg_ms=("latency_ms", "mean"),
+            max_ms=("latency_ms", "max"),
+            docs=("docs", "sum"),
+            kb=("bytes", lambda b: b.sum(min_count=1) / 1024),
+        ).reset_index()
+        return by_query, cache
+
+class InstrumentedCursor:
+    """Cursor wrapper that records latency, documents and bytes when it is exhausted or closed"""
+
+    def __init__(self, cursor, stats, collection, query):
+        self.cursor = cursor
+        self.stats = stats
+        self.collection = collection
+        self.query = query
+        self.started = None
+        self.docs = 0
+        self.size = None
+
+    def sort(self, *args, **kwargs):
+        self.cursor = self.cursor.sort(*args, **kwargs)
+        return self
+
+    def skip(self, *args):
+        self.cursor = self.cursor.skip(*args)
+        return self
+
+    def limit(self, *args):
+        self.cursor = self.cursor.limit(*args)
+        return self
+
+    def batch_size(self, *args):
+        self.cursor = self.cursor.batch_size(*args)
+        return self
+
+    def __iter__(self):
+        self.started = time.perf_counter()
+        try:
+            for doc in self.cursor:
+                self.docs += 1
+                size = self.stats.doc_size(doc)
+                if size is not None:
+                    self.size = (self.size or 0) + size
+                yield doc
+        finally:
+            self.close()
+
+    def close(self):
+        """Close the cursor, recording the query once however far it was read"""
+        self.cursor.close()
+        if self.started is not None:
+            self.stats.record_query(self.collection, "find", self.query, self.started, self.docs, self.size)
+            self.started = None
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+class InstrumentedCollection:
+    """Thin wrapper over a pymongo collection that times every read"""
+
+    def __init__(self, collection, stats):
+        self.collection = collection
+        self.stats = stats
+
+    def find(self, filter=None, *args, **kwargs):
+        return InstrumentedCursor(self.collection.find(filter, *args, **kwargs), self.stats, self.collection.name, filter)
+
+    def find_one(self, filter=None, *args, **kwargs):
+        started = time.perf_counter()
+        doc = self.collection.find_one(filter, *args, **kwargs)
+        self.stats.record_query(self.collection.name, "find_one", filter, started, int(doc is not None),
+                                self.stats.doc_size(doc))
+        return doc
+
+    def aggregate(self, pipeline, *args, **kwargs):
+        started = time.perf_counter()
+        docs = list(self.collection.aggregate(pipeline, *args, **kwargs))
+        sizes = [self.stats.doc_size(doc) for doc in docs] if self.stats.measure_bytes else []
+        self.stats.record_query(self.collection.name, "aggregate", pipeline, started, len(docs),
+                                sum(sizes) if sizes else None)
+        return iter(docs)
+
+    def count_documents(self, filter, *args, **kwargs):
+        started = time.perf_counter()
+        count = self.collection.count_documents(filter, *args, **kwargs)
+        self.stats.record_query(self.collection.name, "count_documents", filter, started, 0, 0)
+        return count
+
+    def estimated_document_count(self, *args, **kwargs):
+        started = time.perf_counter()
+        count = self.collection.estimated_document_count(*args, **kwargs)
+        self.stats.record_query(self.collection.name, "estimated_document_count", None, started, 0, 0)
+        return count
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+class InstrumentedDatabase:
+    def __init__(self, db, stats):
+        self.db = db
+        self.stats = stats
+
+    def __getitem__(self, name):
+        return InstrumentedCollection(self.db[name], self.stats)
+
+    def __getattr__(self, name):
+        return self[name]
+
+@st.cache_resource
+def get_query_stats():
+    monitoring = st.secrets.get("monitoring", {})
+    return QueryStats(monitoring.get("slow_query_ms", SLOW_QUERY_MS), monitoring.get("slow_query_log", SLOW_QUERY_LOG),
+                      monitoring.get("measure_bytes", False))
+
+# Connect to MongoDB Atlas; give up on an unreachable server after this many ms instead of pymongo's 30 s
+SERVER_SELECTION_TIMEOUT_MS = 3000
+
 @st.cache_resource
 def get_db():
     connection_string = st.secrets["database"]["mongodb_connection_string"]
-    client = pymongo.MongoClient(connection_string)
-    return client.GMBLERS
+    # Connect lazily so the app can start from the snapshot while Atlas is unreachable
+    client = pymongo.MongoClient(connection_string, connect=False,
+                                 serverSelectionTimeoutMS=SERVER_SELECTION_TIMEOUT_MS)
+    return InstrumentedDatabase(client.GMBLERS, get_query_stats())
 
-# Get champion data
-@st.cache_data(ttl=3600)
-def get_champion_data():
-    versions = requests.get("https://ddragon.leagueoflegends.com/api/versions.json").json()
-    latest = versions[0]
-    champs = requests.get(f"https://ddragon.leagueoflegends.com/cdn/{latest}/data/en_US/champion.json").json()
-    
-    champ_mapping = {}
-    for key, data in champs["data"].items():
-        champ_name = data["name"]
-        champ_mapping[champ_name.lower()] = key
-        champ_mapping[champ_name.lower().replace(" ", "")] = key
-        champ_mapping[champ_name.lower().replace("'", "")] = key
-        champ_mapping[champ_name.lower().replace(" ", "").replace("'", "")] = key
-        
-        if champ_name == "Wukong":
-            champ_mapping["monkeyking"] = key
-        elif champ_name == "Nunu & Willump":
-            champ_mapping["nunu"] = key
-        
-    return champs["data"], latest, champ_mapping
+# Local Data Dragon files: fetched copies in the cache dir, an optional bundled copy as fallback
+DDRAGON_URL = "https://ddragon.leagueoflegends.com"
+DDRAGON_CACHE_DIR = os.path.join(".cache", "ddragon")
+DDRAGON_BUNDLE_DIR = "ddragon"
+DDRAGON_TIMEOUT = (3, 10)
+DDRAGON_REFRESH_INTERVAL = 3600
+
+class DDragonCache:
+    """On-disk copy of Data Dragon metadata, refreshed in the background.
 
-# Helper function to find champion key with improved matching
-def find_champion_key(champion_name, champion_data, champ_mapping):
-    if not champion_name:
+    Files are read from the cache dir first and from the bundled dir second,
+    so the app starts (and keeps running) without network access. The
+    versions list is refreshed with conditional requests; per-version files
+    never change once published and are only fetched when missing.
+    """
+
+    def __init__(self, cache_dir, bundle_dir, stats):
+        self.cache_dir = cache_dir
+        self.bundle_dir = bundle_dir
+        self.stats = stats
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.session = requests.Session()
+        self.validators = self.read("validators.json") or {}
+
+    def read(self, relpath):
+        for base in (self.cache_dir, self.bundle_dir):
+            try:
+                with open(os.path.join(base, relpath), encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                continue
         return None
-    
-    champ_key = next((k for k, v in champion_data.items() if v["name"] == champion_name), None)
-    if champ_key:
-        return champ_key
-    
-    normalized_name = champion_name.lower().replace(" ", "").replace("'", "")
-    if normalized_name in champ_mapping:
-        return champ_mapping[normalized_name]
-    
-    for key, data in champion_data.items():
-        if champion_name.lower() in data["name"].lower() or data["name"].lower() in champion_name.lower():
+
+    def has(self, relpath):
+        return any(os.path.exists(os.path.join(base, relpath)) for base in (self.cache_dir, self.bundle_dir))
+
+    def write(self, relpath, content):
+        path = os.path.join(self.cache_dir, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def fetch(self, relpath, url_path):
+        """Conditional GET into the cache dir. Returns True if the file changed."""
+        headers = {}
+        validators = self.validators.get(relpath, {})
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        started = time.perf_counter()
+        response = self.session.get(f"{DDRAGON_URL}/{url_path}", headers=headers, timeout=DDRAGON_TIMEOUT)
+        self.stats.record_query("ddragon", relpath, url_path, started, 1, len(response.content))
+        if response.status_code == 304:
+            return False
+        response.raise_for_status()
+        json.loads(response.content)  # never cache a truncated or error payload
+        self.write(relpath, response.content)
+        with self.lock:
+            self.validators[relpath] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            self.write("validators.json", json.dumps(self.validators).encode())
+        return True
+
+    def refresh(self):
+        """Fetch the versions list and the latest champion.json and item.json. Returns True if anything changed."""
+        changed = False
+        try:
+            changed = self.fetch("versions.json", "api/versions.json")
+            latest = (self.read("versions.json") or [None])[0]
+            for filename in ("champion.json", "item.json"):
+                if latest and self.read(f"{latest}/{filename}") is None:
+                    changed = self.fetch(f"{latest}/{filename}", f"cdn/{latest}/data/en_US/{filename}") or changed
+        except (requests.RequestException, OSError, ValueError):
+            pass  # keep serving the local copy
+        if changed:
+            with self.lock:
+                self.generation += 1
+        return changed
+
+    def start(self, delay):
+        def run():
+            while True:
+                time.sleep(delay)
+                self.refresh()
+        threading.Thread(target=run, name="ddragon-refresh", daemon=True).start()
+        return self
+
+@st.cache_resource
+def get_ddragon_cache():
+    cache = DDragonCache(DDRAGON_CACHE_DIR, DDRAGON_BUNDLE_DIR, get_query_stats())
+    if cache.read("versions.json") is None:
+        # Nothing local yet: fetch once in the foreground, with timeouts
+        cache.refresh()
+    else:
+        threading.Thread(target=cache.refresh, name="ddragon-warmup", daemon=True).start()
+    return cache.start(DDRAGON_REFRESH_INTERVAL)
+
+# Champion name resolution
+CHAMPION_ALIASES = {
+    "monkeyking": "Wukong",
+    "nunu": "Nunu & Willump",
+}
+
+def normalize_champion_name(name):
+    return name.lower().replace(" ", "").replace("'", "")
+
+class ChampionResolver:
+    """Maps champion names as written in game data to Data Dragon keys.
+
+    Tries, in order: the exact display name, the normalized name (or a
+    known alias), a substring match in either direction, and finally the
+    key itself. Every index is built once per champion.json and results are
+    memoized per input string, so repeated lookups are a dict hit.
+    """
+
+    def __init__(self, champion_data):
+        self.exact = {}
+        self.normalized = {}
+        self.names = {}      # lowercase display name -> rank
+        self.fragments = {}  # every substring of a lowercase display name -> rank
+        self.keys = list(champion_data)
+        self.key_set = set(self.keys)
+        for rank, (key, data) in enumerate(champion_data.items()):
+            name = data["name"]
+            lowered = name.lower()
+            self.exact.setdefault(name, key)
+            self.normalized.setdefault(normalize_champion_name(name), key)
+            self.names.setdefault(lowered, rank)
+            for start in range(len(lowered)):
+                for end in range(start + 1, len(lowered) + 1):
+                    self.fragments.setdefault(lowered[start:end], rank)
+        for alias, name in CHAMPION_ALIASES.items():
+            if name in self.exact:
+                self.normalized[alias] = self.exact[name]
+        self.memo = {}
+
+    def _fuzzy(self, lowered):
+        # First champion (in champion.json order) whose name contains the
+        # input or is contained in it
+        ranks = []
+        if lowered in self.fragments:
+            ranks.append(self.fragments[lowered])
+        for start in range(len(lowered)):
+            for end in range(start + 1, len(lowered) + 1):
+                rank = self.names.get(lowered[start:end])
+                if rank is not None:
+                    ranks.append(rank)
+        return self.keys[min(ranks)] if ranks else None
+
+    def _resolve(self, champion_name):
+        key = self.exact.get(champion_name)
+        if key:
             return key
-    
-    if champion_name in champion_data:
-        return champion_name
-    
+        key = self.normalized.get(normalize_champion_name(champion_name))
+        if key:
+            return key
+        key = self._fuzzy(champion_name.lower())
+        if key:
+            return key
+        if champion_name in self.key_set:
+            return champion_name
+        return None
+
+    def resolve(self, champion_name):
+        if not champion_name:
+            return None
+        try:
+            return self.memo[champion_name]
+        except KeyError:
+            key = self.memo[champion_name] = self._resolve(champion_name)
+            return key
+
+# Item catalog
+class ItemCatalog:
+    """Data Dragon items indexed by id, with total gold, tags and build path.
+
+    ``items`` is a frame indexed by integer item id so gold and names can be
+    mapped onto whole columns; ``tooltips`` holds the escaped hover text for
+    each icon.
+    """
+
+    def __init__(self, item_data):
+        rows = []
+        for item_id, data in item_data.items():
+            if not item_id.isdigit():
+                continue
+            rows.append({
+                "item_id": int(item_id),
+                "name": data.get("name", ""),
+                "gold": data.get("gold", {}).get("total", 0),
+                "tags": tuple(data.get("tags", ())),
+                "builds_from": tuple(int(i) for i in data.get("from", ())),
+                "builds_into": tuple(int(i) for i in data.get("into", ())),
+            })
+        self.items = pd.DataFrame(rows, columns=[
+            "item_id", "name", "gold", "tags", "builds_from", "builds_into"
+        ]).set_index("item_id")
+        self.gold = self.items["gold"]
+        self.names = self.items["name"]
+
+        self.tooltips = {}
+        names = self.names.to_dict()
+        for item_id, item in self.items.iterrows():
+            lines = [f"{item['name']} ({item['gold']}g)"]
+            if item["tags"]:
+                lines.append(", ".join(item["tags"]))
+            if item["builds_from"]:
+                lines.append("Builds from: " + ", ".join(names.get(i, str(i)) for i in item["builds_from"]))
+            self.tooltips[item_id] = html.escape("\n".join(lines), quote=True).replace("\n", "&#10;")
+
+    def tooltip(self, item_id):
+        return self.tooltips.get(item_id, f"Item {item_id}")
+
+# Per-patch Data Dragon datasets
+DDRAGON_DATASET_LRU = 4
+DDRAGON_RETRY_INTERVAL = 600
+DDRAGON_DOWNLOAD_WORKERS = 4
+DDRAGON_VERSION_FILES = ("champion.json", "item.json")
+
+DDragonDataset = namedtuple("DDragonDataset", ["version", "champion_data", "resolver", "items"])
+
+def game_patch(game_version):
+    """Major.minor patch of a client version string ("14.10.594.2341" -> "14.10")"""
+    parts = str(game_version or "").split(".")
+    if len(parts) >= 2 and parts[0].isdigit() and parts[1].isdigit():
+        return f"{int(parts[0])}.{int(parts[1])}"
     return None
 
-# Load games from MongoDB Atlas
-@st.cache_data(ttl=300)
-def load_games():
+class DDragonDatasets:
+    """Champion and item data for several Data Dragon versions at once.
+
+    Each game is shown with the release of its own patch. Loaded versions
+    are kept in an LRU of at most ``capacity`` entries; tables spanning many
+    patches look datasets up once per version, so the cap bounds memory
+    without the versions evicting each other mid-build. A version that is not on disk is queued for
+    download in the background and the latest local version is used until
+    it lands, when the metadata cache generation is bumped so tables built
+    from the fallback rebuild. A failed download is not retried for
+    ``DDRAGON_RETRY_INTERVAL`` seconds.
+    """
+
+    def __init__(self, cache, capacity):
+        self.cache = cache
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.datasets = OrderedDict()
+        self.executor = ThreadPoolExecutor(max_workers=DDRAGON_DOWNLOAD_WORKERS, thread_name_prefix="ddragon")
+        self.pending = set()
+        self.failed = {}  # version -> time of the last failed download
+        self.indexed_generation = None
+        self.latest_version = ""
+        self.patches = {}
+
+    def _index(self):
+        # Rebuilt only when the metadata cache picked up a new versions list
+        if self.indexed_generation == self.cache.generation:
+            return
+        versions = self.cache.read("versions.json") or []
+        patches = {}
+        for version in versions:
+            patch = game_patch(version)
+            if patch:
+                patches.setdefault(patch, version)
+        # Newest version with a local champion.json, in case the latest one failed to download
+        self.latest_version = next(
+            (v for v in versions if self.cache.read(f"{v}/champion.json") is not None),
+            versions[0] if versions else "",
+        )
+        self.patches = patches
+        self.indexed_generation = self.cache.generation
+
+    def version_for(self, game_version):
+        """Data Dragon release for a game's client version, or the latest one if unknown"""
+        self._index()
+        return self.patches.get(game_patch(game_version), self.latest_version)
+
+    def _load(self, version):
+        """Dataset from the files on disk, or None if champion.json is not there"""
+        files = {filename: self.cache.read(f"{version}/{filename}") for filename in DDRAGON_VERSION_FILES}
+        if files["champion.json"] is None:
+            return None
+        champion_data = files["champion.json"]["data"]
+        item_data = (files["item.json"] or {}).get("data", {})
+        return DDragonDataset(version, champion_data, ChampionResolver(champion_data), ItemCatalog(item_data))
+
+    def download(self, version):
+        try:
+            for filename in DDRAGON_VERSION_FILES:
+                if self.cache.read(f"{version}/{filename}") is None:
+                    try:
+                        self.cache.fetch(f"{version}/{filename}", f"cdn/{version}/data/en_US/{filename}")
+                    except (requests.RequestException, OSError, ValueError):
+                        pass  # item.json is optional; a missing champion.json is handled below
+            if self.cache.read(f"{version}/champion.json") is None:
+                with self.lock:
+                    self.failed[version] = time.monotonic()
+            else:
+                with self.lock:
+                    self.failed.pop(version, None)
+                with self.cache.lock:
+                    self.cache.generation += 1
+        finally:
+            with self.lock:
+                self.pending.discard(version)
+
+    def _queue(self, version):
+        """Start downloading a version unless it is already pending or failed recently"""
+        with self.lock:
+            failed_at = self.failed.get(version)
+            if version in self.pending or not version or (
+                failed_at is not None and time.monotonic() - failed_at < DDRAGON_RETRY_INTERVAL
+            ):
+                return
+            self.pending.add(version)
+        self.executor.submit(self.download, version)
+
+    def _fallback(self, version):
+        return self.latest() if version != self.latest_version else DDragonDataset(version, {}, ChampionResolver({}), ItemCatalog({}))
+
+    def get(self, version):
+        """Dataset for a version; never waits on the network, see the class docstring"""
+        with self.lock:
+            if version in self.datasets:
+                self.datasets.move_to_end(version)
+                return self.datasets[version]
+            unavailable = version in self.pending or version in self.failed
+        dataset = None if unavailable else self._load(version)
+        if dataset is None:
+            self._queue(version)
+            return self._fallback(version)
+        with self.lock:
+            self.failed.pop(version, None)
+            self.datasets[version] = dataset
+            self.datasets.move_to_end(version)
+            while len(self.datasets) > self.capacity:
+                self.datasets.popitem(last=False)
+        return dataset
+
+    def latest(self):
+        self._index()
+        return self.get(self.latest_version)
+
+    def prefetch(self, patches):
+        """Queue downloads for the releases of these game patches that are not on disk"""
+        for version in {self.version_for(patch) for patch in patches}:
+            if not self.cache.has(f"{version}/champion.json"):
+                self._queue(version)
+
+    def for_game(self, game):
+        return self.get(self.version_for(game.get("game_version")))
+
+@st.cache_resource
+def get_ddragon_datasets():
+    return DDragonDatasets(get_ddragon_cache(), DDRAGON_DATASET_LRU)
+
+def get_champion_data():
+    dataset = get_ddragon_datasets().latest()
+    return dataset.champion_data, dataset.version, dataset.resolver
+
+# Icon cache
+ICON_STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "ddragon")
+ICON_STATIC_URL = "app/static/ddragon"
+ICON_DOWNLOAD_WORKERS = 8
+
+class IconCache:
+    """Champion and item icons mirrored into Streamlit's static dir.
+
+    Icons never change once a version is published, so each one is
+    downloaded once and then served by the app itself
+    (``server.enableStaticServing``). An icon that is not local yet falls
+    back to the CDN URL and is queued for download, so the next render
+    serves it locally.
+    """
+
+    def __init__(self, static_dir, static_url, stats):
+        self.static_dir = static_dir
+        self.static_url = static_url
+        self.stats = stats
+        self.lock = threading.Lock()
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=ICON_DOWNLOAD_WORKERS, thread_name_prefix="icon-download")
+        self.pending = set()
+        self.missing = set()
+        self.present = set()
+        for root, _, files in os.walk(static_dir):
+            for filename in files:
+                if filename.endswith(".png"):
+                    relpath = os.path.relpath(os.path.join(root, filename), static_dir)
+                    self.present.add(relpath.replace(os.sep, "/"))
+
+    def download(self, relpath):
+        started = time.perf_counter()
+        try:
+            version, kind, filename = relpath.split("/")
+            response = self.session.get(f"{DDRAGON_URL}/cdn/{version}/img/{kind}/{filename}", timeout=DDRAGON_TIMEOUT)
+            self.stats.record_query("ddragon", f"icon:{kind}", relpath, started, 1, len(response.content))
+            if response.status_code == 404:
+                with self.lock:
+                    self.missing.add(relpath)
+                return
+            response.raise_for_status()
+            if not response.content.startswith(b"\x89PNG"):
+                raise ValueError(f"not a PNG: {relpath}")
+            path = os.path.join(self.static_dir, version, kind, filename)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(response.content)
+            os.replace(tmp_path, path)
+            with self.lock:
+                self.present.add(relpath)
+        except (requests.RequestException, OSError, ValueError):
+            pass  # retried on a later render; a malformed relpath also lands here and is cleared below
+        finally:
+            with self.lock:
+                self.pending.discard(relpath)
+
+    def resolve(self, version, kind, name):
+        """Relative path of a local icon, or None after queueing its download."""
+        relpath = f"{version}/{kind}/{name}.png"
+        with self.lock:
+            if relpath in self.present:
+                return relpath
+            if relpath in self.pending or relpath in self.missing:
+                return None
+            self.pending.add(relpath)
+        self.executor.submit(self.download, relpath)
+        return None
+
+    def local(self, version, icons):
+        """Which of these (kind, name) icons are served locally, as a sorted tuple of relpaths.
+
+        Cached HTML is keyed on this rather than on every download, so a page
+        re-renders only once one of its own icons switches to the local URL.
+        """
+        relpaths = {f"{version}/{kind}/{name}.png" for kind, name in icons}
+        with self.lock:
+            return tuple(sorted(relpaths & self.present))
+
+    def src(self, version, kind, name):
+        """URL for an <img> tag: the app's static route if cached, else the CDN."""
+        relpath = self.resolve(version, kind, name)
+        if relpath:
+            return f"{self.static_url}/{relpath}"
+        return f"{DDRAGON_URL}/cdn/{version}/img/{kind}/{name}.png"
+
+@st.cache_resource
+def get_icon_cache():
+    return IconCache(ICON_STATIC_DIR, ICON_STATIC_URL, get_query_stats())
+
+def champion_icon(champ_key, version):
+    """<img> URL for a champion icon; st.image would re-send a local file on every run"""
+    return get_icon_cache().src(version, "champion", champ_key)
+
+# Fields requested by each page-specific game loader
+GAME_PROJECTIONS = {
+    "summary": {"date": 1, "opponent_team.name": 1, "win": 1, "gmb_side": 1, "game_duration": 1, "game_version": 1},
+    "draft": {"draft.pick_order": 1},
+    "scoreboard": {"gmb_team_id": 1, "final_items": 1, "player_data": 1, "player_positions": 1},
+    "objectives": {"win": 1, "gmb_side": 1, "objectives": 1, "first_blood": 1},
+}
+
+# Local copy of the synced data, read first on startup
+SNAPSHOT_PATH = os.path.join(".cache", "snapshot.sqlite3")
+
+@st.cache_resource
+def get_snapshot():
+    try:
+        return Snapshot(SNAPSHOT_PATH)
+    except (OSError, sqlite3.Error):
+        # Read-only deployments simply run without a snapshot
+        return None
+
+# Synced game views and the watcher keeping them current (data_sync.py), one set per process
+@st.cache_resource
+def get_game_syncs():
+    db = get_db()
+    # Snapshot entries are keyed by the projected fields, so a view whose
+    # projection changed is reloaded instead of restored without the new fields
+    snapshot = get_snapshot()
+    syncs = {
+        view: GameSync(db.GMB_Games, projection, snapshot, f"games:{view}:{','.join(sorted(projection))}")
+        for view, projection in GAME_PROJECTIONS.items()
+    }
+    if snapshot:
+        # Entries written under an older projection would never be read again
+        snapshot.retain("games:", [sync.name for sync in syncs.values()])
+    for sync in syncs.values():
+        sync.restore()
+    return syncs
+
+@st.cache_resource
+def get_data_watcher():
     db = get_db()
-    return list(db.GMB_Games.find().sort("date", -1))
+    snapshot = get_snapshot()
+    # Start from the snapshot's players so the first poll flags them as stale if they changed
+    players = (snapshot.load("players") or None) if snapshot else None
+    return DataWatcher(db.GMB_Games, db.GMB_Players, get_game_syncs(), players=players).start()
+
+def get_data_version():
+    """Current (games, players) version, bumped by the watcher on every real change"""
+    versions = get_data_watcher().versions
+    return versions["games"], versions["players"]
+
+def _load_games_projected(view):
+    get_data_watcher()
+    sync = get_game_syncs()[view]
+    get_query_stats().record_cache(f"load_games_{view}", hit=sync.loaded)
+    if not sync.loaded:
+        sync.refresh()
+    return sync.games
+
+# Load games from MongoDB Atlas, one narrow loader per page need
+def load_games_summary():
+    """Date, opponent, result, side and duration of every game"""
+    return _load_games_projected("summary")
+
+def load_games_draft():
+    """Pick order of every game"""
+    return _load_games_projected("draft")
+
+def load_games_scoreboard():
+    """Final items, player data and positions of every game"""
+    return _load_games_projected("scoreboard")
+
+def load_games_objectives():
+    """Result, side, objectives and first blood of every game"""
+    return _load_games_projected("objectives")
+
+# Fields shown by the Scrims detail view
+GAME_DETAIL_PROJECTION = {
+    field: 1 for projection in GAME_PROJECTIONS.values() for field in projection
+}
+
+@st.cache_data(max_entries=32)
+def _fetch_game_detail(game_id, games_version):
+    db = get_db()
+    doc_id = ObjectId(game_id) if ObjectId.is_valid(game_id) else game_id
+    return db.GMB_Games.find_one({"_id": doc_id}, GAME_DETAIL_PROJECTION)
+
+def get_game_detail(game_id):
+    """One game by id: from the synced views if present, otherwise fetched by _id (most recent few cached)"""
+    game = get_game_repository().records.get(game_id)
+    if game is not None:
+        return game
+    try:
+        return _fetch_game_detail(game_id, get_data_version()[0])
+    except pymongo.errors.PyMongoError:
+        return None
+
+@st.cache_resource(max_entries=2)
+def _load_players(players_version):
+    get_query_stats().record_cache("load_players", hit=False)
+    snapshot = get_snapshot()
+    if players_version == 0 and snapshot:
+        players = snapshot.load("players")
+        if players:
+            return freeze(players)
+    db = get_db()
+    players = list(db.GMB_Players.find())
+    if snapshot:
+        snapshot.replace("players", players)
+    return freeze(players)
 
-@st.cache_data(ttl=300)
 def load_players():
+    return get_query_stats().record_load("load_players", lambda: _load_players(get_data_version()[1]))
+
+@st.cache_resource(max_entries=2)
+def build_player_table(players_version):
+    """Player Stats rows flattened once per players version, with each player's challenges by name"""
+    rows, challenges = [], {}
+    for player in _load_players(players_version):
+        averages = player.get("avg_player_data", {})
+        player_challenges = player.get("avg_challenges", {})
+        rows.append({
+            "name": player.get("name", "Unknown"),
+            "games_played": player.get("games_played", 0),
+            "avg_gold_15min": averages.get("gold_15min", 0),
+            "avg_cs_15min": averages.get("cs_15min", 0),
+            "avg_gold_diff_15min": averages.get("gold_diff_15min", 0),
+            "avg_cs_diff_15min": averages.get("cs_diff_15min", 0),
+            "kda_kills": averages.get("kda_kills", 0),
+            "kda_deaths": averages.get("kda_deaths", 0),
+            "kda_assists": averages.get("kda_assists", 0),
+            "kda_ratio": averages.get("kda_ratio", 0),
+            "avg_kda": averages.get("kda", "0/0/0"),
+            "avg_control_wards": player.get("avg_control_wards", 0),
+            "avg_vision_score": player_challenges.get("vision_score", 0),
+            "avg_damage_per_minute": player_challenges.get("damage_per_minute", 0)
+        })
+        challenges.setdefault(player.get("name"), player_challenges)
+    return pd.DataFrame(rows), MappingProxyType(challenges)
+
+def get_player_table():
+    return build_player_table(get_data_version()[1])
+
+PICK_CODES = {1: "B1", 2: "R1", 3: "R2", 4: "B2", 5: "B3", 6: "R3", 7: "R4", 8: "B4", 9: "B5", 10: "R5"}
+
+def _parse_kda(kda):
+    try:
+        kills, deaths, assists = (int(part) for part in str(kda).split("/"))
+        return kills, deaths, assists
+    except ValueError:
+        return 0, 0, 0
+
+def _draft_pick(pick, index):
+    """Normalized fields of the pick_order entry at position index"""
+    team = pick.get("team", "")
+    sequence = pick.get("sequence_number")
+    code_sequence = sequence if sequence is not None else index + 1
+    return {
+        "sequence": sequence if sequence is not None else 99,
+        "pick_code": PICK_CODES.get(code_sequence, f"Pick {code_sequence}"),
+        "team": team,
+        "is_gmb": "GMB" in team or team == "GMBLERS Esports",
+        "champion": pick.get("champion", ""),
+    }
+
+def _categorize(df, columns):
+    for column in columns:
+        df[column] = df[column].astype("category")
+    return df
+
+# GMBLERS roster, used when GMB_Players has no entry or no role for a player
+DEFAULT_ROSTER = {
+    "ILYXOU": "Top",
+    "Goliah": "Jungle",
+    "iwanan": "Mid",
+    "Marth": "ADC",
+    "Mahonix": "Support",
+}
+ROLES = ["Top", "Jungle", "Mid", "ADC", "Support"]
+ROLE_NAMES = {
+    "top": "Top",
+    "jungle": "Jungle", "jg": "Jungle",
+    "mid": "Mid", "middle": "Mid",
+    "adc": "ADC", "bot": "ADC", "bottom": "ADC",
+    "support": "Support", "sup": "Support", "utility": "Support",
+}
+
+def normalize_player_name(name):
+    return str(name).strip().casefold()
+
+def roster_days(values):
+    """Game or roster dates as calendar days (naive UTC, NaT when missing or unreadable)"""
+    return parse_game_dates(values).dt.normalize()
+
+class RosterRegistry:
+    """GMBLERS roster from the flagged GMB_Players documents, looked up by normalized name or alias"""
+
+    def __init__(self, players):
+        self.index = {}        # normalized name or alias -> canonical name
+        self.roles = {}        # canonical name -> role
+        self.active_from = {}
+        self.active_to = {}
+        default_roles = {normalize_player_name(name): role for name, role in DEFAULT_ROSTER.items()}
+        defaults = [{"name": name, "role": role} for name, role in DEFAULT_ROSTER.items()]
+        named = [player for player in players if player.get("name")]
+        if any("roster" in player for player in named):
+            members = [player for player in named if player.get("roster")]
+        else:
+            members = [player for player in named if normalize_player_name(player["name"]) in default_roles]
+            documented = {normalize_player_name(player["name"]) for player in members}
+            members += [player for player in defaults if normalize_player_name(player["name"]) not in documented]
+        for player in members or defaults:
+            name = player["name"]
+            role = ROLE_NAMES.get(str(player.get("role", "")).strip().lower())
+            self.roles[name] = role or default_roles.get(normalize_player_name(name))
+            self.active_from[name], self.active_to[name] = roster_days([player.get("active_from"), player.get("active_to")])
+            aliases = player.get("aliases") or ()
+            if not isinstance(aliases, (list, tuple)):
+                aliases = ()  # a lone string would otherwise be split into letters
+            for alias in (name, *(alias for alias in aliases if isinstance(alias, str))):
+                self.index.setdefault(normalize_player_name(alias), name)
+
+    def lookup(self, player, date=None):
+        """Canonical roster name for a player name or alias, or None if not on the roster at that date"""
+        name = self.index.get(normalize_player_name(player))
+        if name is None or date is None:
+            return name
+        day = roster_days([date]).iloc[0]
+        if pd.notna(self.active_from[name]) and day < self.active_from[name]:
+            return None
+        if pd.notna(self.active_to[name]) and day > self.active_to[name]:
+            return None
+        return name
+
+    def players_by_role(self):
+        by_role = {}
+        for name, role in self.roles.items():
+            if role:
+                by_role.setdefault(role, []).append(name)
+        return by_role
+
+    def classify(self, participants, game_dates):
+        """Tag GMB participants with their canonical roster name and role, in one pass over the frame"""
+        names = participants["player"].astype(str).str.strip().str.casefold().map(self.index)
+        dates = roster_days(participants["game_id"].map(game_dates))
+        active_from = pd.to_datetime(names.map(self.active_from))
+        active_to = pd.to_datetime(names.map(self.active_to))
+        active = dates.isna() | ((active_from.isna() | (dates >= active_from)) & (active_to.isna() | (dates <= active_to)))
+        on_roster = participants["is_gmb"] & names.notna() & active
+        participants["roster_player"] = names.where(on_roster).astype("category")
+        participants["role"] = names.map(self.roles).where(on_roster).astype("category")
+        return participants
+
+@st.cache_resource(max_entries=2)
+def build_roster(players_version):
+    return RosterRegistry(_load_players(players_version))
+
+def get_roster():
+    return build_roster(get_data_version()[1])
+
+# Build the normalized tables shared by every page, once per games and players version
+@st.cache_resource(max_entries=2)
+def build_game_store(games_version, players_version):
+    """Flatten the synced game views into games, participants, picks and objectives frames"""
+    summaries = load_games_summary()
+    scoreboards = {g["_id"]: g for g in load_games_scoreboard()}
+    drafts = {g["_id"]: g for g in load_games_draft()}
+    objectives = {g["_id"]: g for g in load_games_objectives()}
+
+    game_rows, participant_rows, pick_rows, objective_rows = [], [], [], []
+    for summary in summaries:
+        doc_id = summary["_id"]
+        game_id = str(doc_id)
+        scoreboard = scoreboards.get(doc_id, {})
+        game_objectives = objectives.get(doc_id, {})
+        gmb_team_id = scoreboard.get("gmb_team_id")
+        win = mongo_truthy(summary.get("win"))
+
+        game_rows.append({
+            "game_id": game_id,
+            "date": summary.get("date"),
+            "opponent": summary.get("opponent_team", {}).get("name", "Unknown"),
+            "win": win,
+            "side": game_side(summary),
+            "duration": summary.get("game_duration", "0:00"),
+            "gmb_team_id": gmb_team_id,
+            "first_blood": game_objectives.get("first_blood", {}).get("team"),
+            "patch": game_patch(summary.get("game_version")),
+        })
+
+        final_items = scoreboard.get("final_items", {})
+        player_data = scoreboard.get("player_data", {})
+        positions = scoreboard.get("player_positions", {})
+        for player in list(final_items) + [p for p in player_data if p not in final_items]:
+            item_data = final_items.get(player, {})
+            stats = player_data.get(player, {})
+            kills, deaths, assists = _parse_kda(stats.get("kda", "0/0/0"))
+            is_gmb = "team_id" in item_data and item_data["team_id"] == gmb_team_id
+            participant_rows.append({
+                "game_id": game_id,
+                "player": player,
+                "champion": item_data.get("champion"),
+                "team_id": item_data.get("team_id"),
+                "is_gmb": is_gmb,
+                "position": positions.get(player, ""),
+                "win": win == is_gmb,
+                "kda": stats.get("kda", "0/0/0"),
+                "kills": kills,
+                "deaths": deaths,
+                "assists": assists,
+                "gold_15min": stats.get("gold_15min", 0),
+                "cs_15min": stats.get("cs_15min", 0),
+                "gold_diff_15min": stats.get("gold_diff_15min", 0),
+                "cs_diff_15min": stats.get("cs_diff_15min", 0),
+                "items": [item_id for item_id in item_data.get("items", [])[:6] if item_id > 0],
+                "trinket": item_data.get("trinket", 0),
+            })
+
+        for i, pick in enumerate(drafts.get(doc_id, {}).get("draft", {}).get("pick_order", [])):
+            pick_rows.append({"game_id": game_id, **_draft_pick(pick, i)})
+
+        objective_rows.extend(game_objective_rows(game_id, game_objectives, win))
+
+    games = _categorize(pd.DataFrame(game_rows, columns=[
+        "game_id", "date", "opponent", "win", "side", "duration", "gmb_team_id", "first_blood", "patch"
+    ]), ["opponent", "side", "patch"])
+    participants = _categorize(pd.DataFrame(participant_rows, columns=[
+        "game_id", "player", "champion", "team_id", "is_gmb", "position", "win", "kda", "kills", "deaths",
+        "assists", "gold_15min", "cs_15min", "gold_diff_15min", "cs_diff_15min", "items", "trinket"
+    ]), ["player", "champion", "position"])
+    participants = build_roster(players_version).classify(participants, games.set_index("game_id")["date"])
+    picks = _categorize(pd.DataFrame(pick_rows, columns=[
+        "game_id", "sequence", "pick_code", "team", "is_gmb", "champion"
+    ]).sort_values(["game_id", "sequence"], kind="stable"), ["pick_code", "team", "champion"])
+    objectives = _categorize(pd.DataFrame(objective_rows, columns=[
+        "game_id", "team", "objective", "kills", "first", "win"
+    ]), ["team", "objective"])
+
+    # Shared by every session: pages filter and group these frames but never assign into them
+    return MappingProxyType({"games": games, "participants": participants, "picks": picks, "objectives": objectives})
+
+def get_game_store():
+    return build_game_store(*get_data_version())
+
+# Draft timelines, normalized once per data version
+DraftPick = namedtuple("DraftPick", ["sequence", "pick_code", "side", "team", "is_gmb", "champion", "champ_key"])
+PICK_SIDES = {"B": "blue", "R": "red"}
+
+def draft_timeline(pick_order, resolver):
+    """Ordered, immutable picks for one game's raw pick_order"""
+    picks = sorted((_draft_pick(pick, i) for i, pick in enumerate(pick_order)), key=lambda pick: pick["sequence"])
+    return tuple(
+        DraftPick(side=PICK_SIDES.get(pick["pick_code"][:1]), champ_key=resolver.resolve(pick["champion"]), **pick)
+        for pick in picks
+    )
+
+@st.cache_resource(max_entries=2)
+def build_draft_timelines(games_version, players_version, ddragon_generation):
+    """Draft timeline of every synced game, with champion keys from the game's own patch"""
+    store = build_game_store(games_version, players_version)
+    datasets = get_ddragon_datasets()
+    patches = store["games"].set_index("game_id")["patch"].astype(object)
+    versions = {patch: datasets.version_for(patch) for patch in patches.dropna().unique()}
+    game_versions = patches.map(versions).fillna(datasets.version_for(None))
+    picks = store["picks"]
+    rows_by_game = picks.groupby("game_id", sort=False).indices
+    timelines = {}
+    # One dataset lookup per version, so the LRU never cycles through versions mid-build
+    for version, game_ids in game_versions.groupby(game_versions, sort=False).groups.items():
+        resolver = datasets.get(version).resolver
+        for game_id in game_ids:
+            if game_id not in rows_by_game:
+                continue
+            game_picks = picks.iloc[rows_by_game[game_id]]
+            timelines[game_id] = tuple(
+                DraftPick(sequence, str(pick_code), PICK_SIDES.get(str(pick_code)[:1]), str(team), bool(is_gmb),
+                          str(champion), resolver.resolve(str(champion)))
+                for sequence, pick_code, team, is_gmb, champion in zip(
+                    game_picks["sequence"], game_picks["pick_code"], game_picks["team"],
+                    game_picks["is_gmb"], game_picks["champion"],
+                )
+            )
+    return MappingProxyType(timelines)
+
+def get_draft_timeline(game_id, game, assets):
+    """Precomputed timeline for a synced game, or one built from the fetched document"""
+    timeline = build_draft_timelines(*get_data_version(), get_ddragon_cache().generation).get(game_id)
+    if timeline is None:
+        timeline = draft_timeline(game.get("draft", {}).get("pick_order", ()), assets.resolver)
+    return timeline
+
+# Direct lookups by game id
+class GameRepository:
+    """Synced games keyed by id string, with their row positions in the store frames.
+
+    ``records`` holds each game merged from the synced views (read-only,
+    shared with the views). ``game_index`` maps an id to its row in the
+    games frame and ``participant_rows`` to the rows of its participants,
+    so pages can ``iloc`` straight to a game instead of scanning for it.
+    """
+
+    def __init__(self, views, store):
+        records = {}
+        for games in views:
+            for game in games:
+                records.setdefault(str(game["_id"]), []).append(game)
+        self.records = {
+            game_id: MappingProxyType({key: value for part in parts for key, value in part.items()})
+            for game_id, parts in records.items()
+        }
+        self.store = store
+        self.game_index = pd.Index(store["games"]["game_id"])
+        self.participant_rows = store["participants"].groupby("game_id", sort=False).indices
+
+    def game_rows(self, game_ids):
+        """Row positions in the games frame for a sequence of ids; KeyError if any id is unknown"""
+        rows = self.game_index.get_indexer(game_ids)
+        if (rows < 0).any():
+            unknown = pd.Index(game_ids)[rows < 0]
+            raise KeyError(f"Unknown game ids: {', '.join(map(str, unknown[:5]))}")
+        return rows
+
+    def participants(self, game_id):
+        return self.store["participants"].iloc[self.participant_rows.get(game_id, [])]
+
+@st.cache_resource(max_entries=2)
+def build_game_repository(games_version, players_version):
+    views = (load_games_summary(), load_games_draft(), load_games_scoreboard(), load_games_objectives())
+    return GameRepository(views, build_game_store(games_version, players_version))
+
+def get_game_repository():
+    return build_game_repository(*get_data_version())
+
+# Scrims list: typed table and filter engine
+SCRIM_COLUMNS = ["id", "date", "date_text", "opponent", "result", "side", "duration", "win", "label"]
+SCRIM_PAGE_SIZES = [10, 25, 50, 100]
+
+def parse_game_dates(values):
+    """Game dates as naive UTC datetimes: ISO 8601 first, then any other format pandas can read"""
+    values = pd.Series(values)
+    dates = pd.to_datetime(values, errors="coerce", format="ISO8601", utc=True)
+    unparsed = dates.isna() & values.notna()
+    if unparsed.any():
+        dates[unparsed] = pd.to_datetime(values[unparsed].astype(str), errors="coerce", format="mixed", utc=True)
+    return dates.dt.tz_localize(None)
+
+class ScrimFilter:
+    """Typed, newest-first scrim table; every Scrims filter is one vectorized boolean mask"""
+
+    def __init__(self, games):
+        dates = parse_game_dates(games["date"])
+        result = pd.Categorical(np.where(games["win"], "WIN", "LOSS"), categories=["WIN", "LOSS"])
+        frame = pd.DataFrame({
+            "id": games["game_id"],
+            "date": dates,
+            "date_text": games["date"].astype(str),
+            "opponent": games["opponent"],
+            "result": result,
+            "side": games["side"],
+            "duration": games["duration"],
+            "win": games["win"].astype(bool),
+            "label": (games["date"].astype(str) + " | " + games["opponent"].astype(str) + " ("
+                      + result.astype(str) + ", " + games["side"].astype(str) + " side)"),
+        }, columns=SCRIM_COLUMNS)
+        frame = frame.sort_values(["date", "id"], ascending=False, na_position="last").reset_index(drop=True)
+        # Games of one block often share date, opponent, result and side: number them in play order
+        repeats = frame["label"].duplicated(keep=False)
+        if repeats.any():
+            game_numbers = frame.loc[repeats].iloc[::-1].groupby("label", sort=False).cumcount() + 1
+            frame.loc[game_numbers.index, "label"] += " · Game " + game_numbers.astype(str)
+        self.frame = frame
+        self.positions = pd.Index(self.frame["id"])
+        self.dates = self.frame["date"].to_numpy()
+        self.wins = self.frame["win"].to_numpy()
+        self.codes = {column: self.frame[column].cat.codes.to_numpy() for column in ("opponent", "side")}
+        self.categories = {column: self.frame[column].cat.categories for column in ("opponent", "side")}
+
+        known_dates = self.frame["date"].dropna()
+        self.date_range = (known_dates.min().date(), known_dates.max().date()) if len(known_dates) else None
+        self.undated = len(self.frame) - len(known_dates)
+        self.total_games = len(self.frame)
+        self.total_wins = int(self.wins.sum())
+        self.opponents = sorted(str(opponent) for opponent in self.frame["opponent"].dropna().unique())
+
+    def _equals(self, column, value):
+        categories = self.categories[column]
+        if value not in categories:
+            return np.zeros(len(self.frame), dtype=bool)
+        return self.codes[column] == categories.get_loc(value)
+
+    def mask(self, scrim_filters):
+        """Rows matching the page's (date_bounds, result, side, opponent, game_ids) tuple"""
+        date_bounds, result, side, opponent, game_ids = scrim_filters
+        mask = np.ones(len(self.frame), dtype=bool)
+        if date_bounds:
+            # Whole days, so games stored with a time of day on the end date still match
+            start = np.datetime64(pd.Timestamp(date_bounds[0]))
+            end = np.datetime64(pd.Timestamp(date_bounds[1]) + pd.Timedelta(days=1))
+            mask &= ((self.dates >= start) & (self.dates < end)) | np.isnat(self.dates)
+        if result != "All":
+            mask &= self.wins == (result == "WIN")
+        if side != "All":
+            mask &= self._equals("side", side)
+        if opponent != "All":
+            mask &= self._equals("opponent", opponent)
+        if game_ids is not None:
+            selected = np.zeros(len(self.frame), dtype=bool)
+            positions = self.positions.get_indexer(list(game_ids))
+            selected[positions[positions >= 0]] = True
+            mask &= selected
+        return mask
+
+    def filter(self, scrim_filters):
+        return self.frame[self.mask(scrim_filters)]
+
+@st.cache_resource(max_entries=2)
+def build_scrim_filter(games_version, players_version):
+    return ScrimFilter(build_game_store(games_version, players_version)["games"])
+
+def get_scrim_filter():
+    return build_scrim_filter(*get_data_version())
+
+# Server-side scrim paging: the same filters as a MongoDB query, one cursor page at a time
+def _scrim_row(game):
+    date_text = str(game.get("date"))
+    opponent = game.get("opponent_team", {}).get("name", "Unknown")
+    result = "WIN" if game.get("win") else "LOSS"
+    side = game.get("gmb_side", "").upper()
+    return {
+        "id": str(game.get("_id")),
+        "date": game.get("date"),
+        "date_text": date_text,
+        "opponent": opponent,
+        "result": result,
+        "side": side,
+        "duration": game.get("game_duration", "0:00"),
+        "win": bool(game.get("win")),
+        "label": f"{date_text} | {opponent} ({result}, {side} side)",
+    }
+
+def build_scrim_query(scrim_filters):
+    """MongoDB filter for the Scrims filters; game_ids restricts to champion filter and search matches"""
+    date_bounds, result, side, opponent, game_ids = scrim_filters
+    query = {}
+    if date_bounds:
+        # Whole days, like ScrimFilter.mask
+        end = (pd.Timestamp(date_bounds[1]) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+        query["date"] = {"$gte": date_bounds[0], "$lt": end}
+    if result != "All":
+        # Same truthiness as the synced table (mongo_truthy): false, null, missing and 0 are losses
+        query["win"] = {"$nin": [False, None, 0]} if result == "WIN" else {"$in": [False, None, 0]}
+    if side != "All":
+        query["gmb_side"] = side.lower()
+    if opponent != "All":
+        query["opponent_team.name"] = opponent
+    if game_ids is not None:
+        query["_id"] = {"$in": [ObjectId(i) if ObjectId.is_valid(i) else i for i in game_ids]}
+    return query
+
+def iter_scrim_page(scrim_filters, page, page_size):
+    """Stream one page of scrim rows, newest first, straight from the cursor"""
     db = get_db()
-    return list(db.GMB_Players.find())
+    cursor = (db.GMB_Games.find(build_scrim_query(scrim_filters), GAME_PROJECTIONS["summary"])
+              .sort([("date", -1), ("_id", -1)])
+              .skip(page * page_size)
+              .limit(page_size)
+              .batch_size(page_size))
+    for game in cursor:
+        yield _scrim_row(game)
+
+@st.cache_data(max_entries=64)
+def load_scrim_page(scrim_filters, page, page_size, games_version):
+    return list(iter_scrim_page(scrim_filters, page, page_size))
+
+@st.cache_data(max_entries=64)
+def count_scrims(scrim_filters, games_version):
+    db = get_db()
+    return db.GMB_Games.count_documents(build_scrim_query(scrim_filters))
+
+def scrim_page_frame(rows, scrim_filter):
+    """Cursor rows as a scrim table, with the synced table's unique labels where the game is known"""
+    page = pd.DataFrame(rows, columns=SCRIM_COLUMNS)
+    page["date"] = parse_game_dates(page["date"])
+    positions = scrim_filter.positions.get_indexer(page["id"])
+    known = positions >= 0
+    page.loc[known, "label"] = scrim_filter.frame["label"].to_numpy()[positions[known]]
+    return page
+
+# Champion -> game ids, for the Scrims champion filters
+@st.cache_resource(max_entries=2)
+def build_champion_index(games_version, players_version):
+    """Inverted index from champion to the set of games it was played in, by GMB roster players or by opponents"""
+    participants = build_game_store(games_version, players_version)["participants"]
+    picks = participants[participants["champion"].notna() & (participants["champion"] != "")]
+    index = {}
+    for side, side_picks in (("allied", picks[picks["roster_player"].notna()]), ("enemy", picks[~picks["is_gmb"]])):
+        games_by_champion = side_picks.groupby("champion", observed=True)["game_id"].agg(frozenset)
+        index[side] = MappingProxyType(dict(zip(games_by_champion.index.astype(str), games_by_champion)))
+    return MappingProxyType(index)
+
+def get_champion_index():
+    return build_champion_index(*get_data_version())
+
+# Full-text scrim search: token -> game ids, with prefix matching
+SEARCH_TOKEN = re.compile(r"[0-9a-z]+(?:-[0-9a-z]+)*")
+SEARCH_STOP_WORDS = {"vs", "v", "against", "and"}
+SEARCH_FIELD_WEIGHTS = {"opponent": 3.0, "player": 2.0, "champion": 2.0, "date": 1.0}
+SEARCH_PREFIX_WEIGHT = 0.6
+
+def search_tokens(text):
+    """Lowercase word tokens, apostrophes dropped; multi-word values also yield their joined form"""
+    tokens = SEARCH_TOKEN.findall(str(text).casefold().replace("'", ""))
+    if len(tokens) > 1:
+        tokens.append("".join(tokens))
+    return tokens
+
+class ScrimSearchIndex:
+    """Inverted index over opponent, player names, champions on both sides and date.
+
+    ``postings`` maps a token to ``{game_id: weight}``, the weight being that
+    of the strongest field the token appears in. Tokens are kept sorted so a
+    query term expands to every token it prefixes with two bisections. Every
+    query term must match; games are ranked by summed weight (exact matches
+    count more than prefixes), then newest first.
+    """
+
+    def __init__(self, store):
+        games = store["games"]
+        participants = store["participants"]
+        roster = participants[participants["roster_player"].notna()]
+        fields = [
+            ("opponent", games.groupby("opponent", observed=True)["game_id"].agg(frozenset)),
+            ("date", games.groupby(games["date"].astype(str))["game_id"].agg(frozenset)),
+            ("player", participants.groupby("player", observed=True)["game_id"].agg(frozenset)),
+            ("player", roster.groupby("roster_player", observed=True)["game_id"].agg(frozenset)),
+            ("champion", participants.groupby("champion", observed=True)["game_id"].agg(frozenset)),
+        ]
+
+        postings = {}
+        for field, games_by_value in fields:
+            weight = SEARCH_FIELD_WEIGHTS[field]
+            for value, game_ids in games_by_value.items():
+                for token in search_tokens(value):
+                    posting = postings.setdefault(token, {})
+                    for game_id in game_ids:
+                        if posting.get(game_id, 0) < weight:
+                            posting[game_id] = weight
+        self.postings = postings
+        self.tokens = sorted(postings)
+        dates = pd.to_datetime(games["date"], errors="coerce", format="ISO8601", utc=True)
+        self.recency = dict(zip(games["game_id"], dates.rank(method="first", na_option="bottom", ascending=False)))
+
+    def _term_scores(self, term):
+        """Best weight per game for one query term, over every token it prefixes"""
+        scores = {}
+        start = bisect.bisect_left(self.tokens, term)
+        end = bisect.bisect_left(self.tokens, term + "\uffff")
+        for token in self.tokens[start:end]:
+            factor = 1.0 if token == term else SEARCH_PREFIX_WEIGHT
+            for game_id, weight in self.postings[token].items():
+                score = weight * factor
+                if scores.get(game_id, 0) < score:
+                    scores[game_id] = score
+        return scores
+
+    def search(self, query):
+        """Game ids matching every term of the query, best first; None for an empty query"""
+        terms = [term for term in SEARCH_TOKEN.findall(query.casefold().replace("'", "")) if term not in SEARCH_STOP_WORDS]
+        if not terms:
+            return None
+        totals = None
+        for term in terms:
+            scores = self._term_scores(term)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {game_id: totals[game_id] + score for game_id, score in scores.items() if game_id in totals}
+            if not totals:
+                return []
+        return sorted(totals, key=lambda game_id: (-totals[game_id], self.recency.get(game_id, float("inf"))))
+
+@st.cache_resource(max_entries=2)
+def build_search_index(games_version, players_version):
+    return ScrimSearchIndex(build_game_store(games_version, players_version))
+
+def get_search_index():
+    return build_search_index(*get_data_version())
+
+# Scrim comparison: per-game metric tables, sliced for any set of games
+COMPARE_PLAYER_METRICS = {
+    "Gold Diff@15": "gold_diff_15min",
+    "CS Diff@15": "cs_diff_15min",
+    "Gold@15": "gold_15min",
+    "CS@15": "cs_15min",
+    "KDA": "kda",
+    "Champion": "champion",
+}
+NO_ROLE = "No role"
+
+class ScrimMetrics:
+    """Per-game and per-roster-player metric tables, sliced together for the scrims compared"""
+
+    def __init__(self, store):
+        games = store["games"].set_index("game_id")
+        participants = store["participants"]
+        teams = participants.assign(team=np.where(participants["is_gmb"], "GMB", "Opponent"))
+        totals = teams.groupby(["game_id", "team"])[["kills", "gold_diff_15min", "cs_diff_15min"]].sum().unstack("team")
+        objectives = store["objectives"].pivot_table(
+            index="game_id", columns=["objective", "team"], values="kills", aggfunc="sum", observed=True
+        )
+        objectives.columns = [f"{objective} {team}" for objective, team in objectives.columns]
+        picks = store["picks"].assign(champion=store["picks"]["champion"].astype(str))
+        drafts = picks.groupby(["game_id", "is_gmb"])["champion"].agg(", ".join).unstack("is_gmb")
+
+        frame = pd.DataFrame({
+            "date": games["date"].astype(str),
+            "opponent": games["opponent"].astype(str),
+            "result": np.where(games["win"], "WIN", "LOSS"),
+            "side": games["side"].astype(str),
+            "duration": games["duration"],
+            "kills": totals.get(("kills", "GMB")),
+            "deaths": totals.get(("kills", "Opponent")),
+            "gold_diff_15min": totals.get(("gold_diff_15min", "GMB")),
+            "cs_diff_15min": totals.get(("cs_diff_15min", "GMB")),
+            "gmb_picks": drafts.get(True),
+            "opponent_picks": drafts.get(False),
+        }, index=games.index)
+        self.objectives = sorted({column.rsplit(" ", 1)[0] for column in objectives.columns})
+        self.games = frame.join(objectives.reindex(columns=[
+            f"{objective} {team}" for objective in self.objectives for team in ("GMB", "Opponent")
+        ]))
+        roster_rows = participants[participants["roster_player"].notna()]
+        self.players = pd.DataFrame({
+            "game_id": roster_rows["game_id"],
+            "role": pd.Categorical(roster_rows["role"].astype(object).fillna(NO_ROLE), categories=ROLES + [NO_ROLE]),
+            "player": roster_rows["roster_player"].astype(str),
+            **{column: roster_rows[column] for column in (
+                "champion", "kda", "kills", "deaths", "assists", "win",
+                "gold_15min", "cs_15min", "gold_diff_15min", "cs_diff_15min",
+            )},
+        })
+
+    def compare(self, game_ids):
+        """Rows of the selected games, oldest first and labelled G1..Gn, and their roster players"""
+        rows = self.games.index.get_indexer(list(dict.fromkeys(game_ids)))
+        games = self.games.iloc[rows[rows >= 0]].sort_values("date", kind="stable")
+        labels = pd.Series([f"G{n}" for n in range(1, len(games) + 1)], index=games.index)
+        players = self.players[self.players["game_id"].isin(games.index)]
+        return games.assign(game=labels), players.assign(game=players["game_id"].map(labels))
+
+@st.cache_resource(max_entries=2)
+def build_scrim_metrics(games_version, players_version):
+    return ScrimMetrics(build_game_store(games_version, players_version))
+
+def get_scrim_metrics():
+    return build_scrim_metrics(*get_data_version())
+
+# Item slots of every participant, priced from the item catalog of each game's patch
+@st.cache_resource(max_entries=2)
+def build_item_tables(games_version, players_version, ddragon_generation):
+    """Explode participant items into one row per slot and derive gold totals and per-champion build frequency"""
+    store = build_game_store(games_version, players_version)
+    participants = store["participants"]
+    datasets = get_ddragon_datasets()
+    catalog = datasets.latest().items
+
+    items = participants[["game_id", "player", "champion", "is_gmb", "items"]].explode("items")
+    items = items.dropna(subset=["items"]).rename(columns={"items": "item_id"}).assign(slot="item")
+    trinkets = participants.loc[participants["trinket"] > 0, ["game_id", "player", "champion", "is_gmb", "trinket"]]
+    trinkets = trinkets.rename(columns={"trinket": "item_id"}).assign(slot="trinket")
+    slots = pd.concat([items, trinkets], ignore_index=True)
+    slots["item_id"] = slots["item_id"].astype("int64")
+    # One catalog per patch present, not one lookup per slot
+    patches = slots["game_id"].map(store["games"].set_index("game_id")["patch"].astype(object))
+    versions = patches.map({patch: datasets.version_for(patch) for patch in patches.dropna().unique()})
+    versions = versions.fillna(datasets.version_for(None))
+    slots["gold"] = 0
+    for version, rows in slots.groupby(versions, sort=False).groups.items():
+        slots.loc[rows, "gold"] = slots.loc[rows, "item_id"].map(datasets.get(version).items.gold).fillna(0).astype("int64")
+
+    player_gold = slots.groupby(["game_id", "player"], observed=True, sort=False)["gold"].sum()
+
+    # Share of a champion's games that finished with each item
+    built = slots[slots["slot"] == "item"].drop_duplicates(["game_id", "player", "item_id"])
+    champion_games = participants[participants["champion"].notna()].groupby("champion", observed=True).size()
+    counts = built.groupby(["champion", "item_id"], observed=True).size()
+    frequency = counts.rename("games").to_frame()
+    frequency["frequency"] = counts.div(champion_games, level="champion")
+    frequency = frequency.reset_index()
+    frequency["item"] = frequency["item_id"].map(catalog.names).fillna(frequency["item_id"].astype(str))
+    frequency["gold"] = frequency["item_id"].map(catalog.gold).fillna(0).astype("int64")
+    frequency = frequency.sort_values(["champion", "frequency"], ascending=[True, False], kind="stable")
+
+    return MappingProxyType({"slots": slots, "player_gold": player_gold, "frequency": frequency})
+
+def get_item_tables():
+    return build_item_tables(*get_data_version(), get_ddragon_cache().generation)
+
+@st.cache_data(max_entries=2)
+def aggregate_team_stats(games_version):
+    """Same figures as compute_team_stats, computed by MongoDB in a single $group"""
+    db = get_db()
+    return team_stats_from_result(next(db.GMB_Games.aggregate(team_stats_pipeline()), None))
+
+# Startup warm-up
+WARMUP_WORKERS = 6
+
+def prefetch_icons(store, item_slots, datasets, icons):
+    """Queue downloads for every champion and item icon referenced by the synced games, per game version"""
+    patches = store["games"].set_index("game_id")["patch"].astype(object)
+    versions = patches.map({patch: datasets.version_for(patch) for patch in patches.dropna().unique()})
+    versions = versions.fillna(datasets.version_for(None))
+
+    champions = pd.concat([store["participants"][["game_id", "champion"]], store["picks"][["game_id", "champion"]]])
+    champions = champions.dropna().astype({"champion": str}).assign(version=lambda df: df["game_id"].map(versions))
+    for version, group in champions.drop_duplicates(["version", "champion"]).groupby("version", sort=False):
+        dataset = datasets.get(version)
+        for champion in group["champion"]:
+            champ_key = dataset.resolver.resolve(champion)
+            if champ_key:
+                icons.resolve(dataset.version, "champion", champ_key)
+
+    items = item_slots[["game_id", "item_id"]]
+    items = items.assign(version=items["game_id"].map(versions))
+    for version, group in items.drop_duplicates(["version", "item_id"]).groupby("version", sort=False):
+        for item_id in group["item_id"]:
+            icons.resolve(version, "item", item_id)
+
+@st.cache_resource(show_spinner="Loading scrim data...")
+def warm_up():
+    """Run the independent startup loads concurrently, once per process.
+
+    The game views, players and Data Dragon metadata come from different
+    sources, so the first render waits for the slowest of them rather than
+    their sum. The Data Dragon releases on disk for the patches present and
+    the tables built from them (item prices, draft timelines) run in the same
+    pool, after the loads they depend on; missing releases and icons are
+    downloaded in the background. Returns the duration of each task in ms for the diagnostics
+    panel.
+    """
+    ctx = get_script_run_ctx()
+    timings = {}
+
+    def timed(name, load):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        started = time.perf_counter()
+        try:
+            load()
+        except (pymongo.errors.PyMongoError, requests.RequestException, OSError):
+            pass  # the page's own loaders retry and report the failure
+        timings[name] = (time.perf_counter() - started) * 1000
+
+    tasks = {f"games:{view}": (lambda view=view: _load_games_projected(view)) for view in GAME_PROJECTIONS}
+    tasks["players"] = load_players
+    tasks["ddragon"] = lambda: get_ddragon_datasets().latest()
+    # Submitted after the loads they wait on, so the pool never blocks on a task that has not started
+    tasks["ddragon:patches"] = lambda: get_ddragon_datasets().prefetch(
+        {game_patch(game.get("game_version")) for game in load_games_summary()}
+    )
+    tasks["items"] = get_item_tables
+    tasks["drafts"] = lambda: build_draft_timelines(*get_data_version(), get_ddragon_cache().generation)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WARMUP_WORKERS, thread_name_prefix="warmup") as pool:
+        for name, load in tasks.items():
+            pool.submit(timed, name, load)
+    timings["total"] = (time.perf_counter() - started) * 1000
+
+    # Resolved here, with the script context, so the prefetch thread only reads them
+    try:
+        args = (get_game_store(), get_item_tables()["slots"], get_ddragon_datasets(), get_icon_cache())
+    except (pymongo.errors.PyMongoError, requests.RequestException, OSError):
+        return timings
+    threading.Thread(target=prefetch_icons, args=args, name="icon-prefetch", daemon=True).start()
+    return timings
+
+warm_up_timings = warm_up()
 
 # Format time difference for readability
 def format_time_diff(seconds):
@@ -645,25 +2178,29 @@ with st.sidebar:
             <p style="color: #94a3b8; font-size: 0.9rem; margin: 0;">Analytics Dashboard</p>
         </div>
     </div>
-    """.format(
-        # Try to load logo and convert to base64, or use empty string if it fails
-        __import__('base64').b64encode(open("logo.png", "rb").read()).decode() if __import__('os').path.exists("logo.png") else ""
-    ), unsafe_allow_html=True)
+    """.format(load_logo_base64()), unsafe_allow_html=True)
+    
+    # A new ?game=<id> link opens the Scrims page on that game, whichever page was showing
+    linked_id = st.query_params.get("game")
+    if linked_id and linked_id != st.session_state.get("linked_game"):
+        st.session_state["nav_page"] = "Scrims"
+        st.session_state["scrims_mode"] = "Single scrim"
     
     # Modern navigation
     page = st.radio(
         "Navigation",
-        ["Scrims", "Team Stats", "Player Stats", "Champion Analysis"]
+        ["Scrims", "Team Stats", "Player Stats", "Champion Analysis"],
+        key="nav_page"
     )
     
     # Add some stats in sidebar
     st.markdown("---")
     
-    # Quick stats
-    games = load_games()
-    if games:
-        total_games = len(games)
-        wins = sum(1 for game in games if game.get("win"))
+    # Quick stats, precomputed with the scrim table
+    scrim_filter = get_scrim_filter()
+    if scrim_filter.total_games:
+        total_games = scrim_filter.total_games
+        wins = scrim_filter.total_wins
         win_rate = (wins / total_games * 100) if total_games > 0 else 0
         
         st.markdown(f"""
@@ -676,14 +2213,40 @@ with st.sidebar:
             </p>
         </div>
         """, unsafe_allow_html=True)
+    
+    # Query diagnostics, only for the admin login
+    render_time = None
+    if st.session_state.get("is_admin"):
+        with st.expander("Query Diagnostics"):
+            query_summary, cache_counts = get_query_stats().summary()
+            st.caption(f"Slow-query threshold: {get_query_stats().slow_query_ms} ms")
+            if not get_query_stats().measure_bytes:
+                st.caption("Byte counts are off; set `monitoring.measure_bytes = true` to measure them")
+            st.caption("Warm-up: " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in warm_up_timings.items()))
+            st.dataframe(
+                query_summary,
+                column_config={
+                    "avg_ms": st.column_config.NumberColumn("Avg ms", format="%.1f"),
+                    "max_ms": st.column_config.NumberColumn("Max ms", format="%.1f"),
+                    "kb": st.column_config.NumberColumn("KB", format="%.1f"),
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+            st.dataframe(
+                pd.DataFrame([{"loader": loader, **counts} for loader, counts in cache_counts.items()],
+                             columns=["loader", "hits", "misses"]),
+                hide_index=True,
+                use_container_width=True
+            )
+            render_time = st.empty()
 
 # Load data
-games = load_games()
 players_db = load_players()
-champion_data, ddragon_version, champ_mapping = get_champion_data()
+champion_data, ddragon_version, champ_resolver = get_champion_data()
 
 # Helper functions for the enhanced Champion Analysis page
-def create_champion_card(champ_data, role_color, champion_data, champ_mapping, ddragon_version):
+def create_champion_card(champ_data, role_color, champion_data, champ_resolver, ddragon_version):
     """Create a simple champion card with clear separation using only native Streamlit components"""
     champion_name = champ_data["champion"]
     win_rate = champ_data["win_rate"]
@@ -692,7 +2255,7 @@ def create_champion_card(champ_data, role_color, champion_data, champ_mapping, d
     losses = champ_data["losses"]
     
     # Get champion key for image
-    champ_key = find_champion_key(champion_name, champion_data, champ_mapping)
+    champ_key = champ_resolver.resolve(champion_name)
     
     # Determine win rate status
     if win_rate >= 70:
@@ -706,10 +2269,8 @@ def create_champion_card(champ_data, role_color, champion_data, champ_mapping, d
     col1, col2, col3 = st.columns([1, 1, 1])
     with col2:
         if champ_key:
-            st.image(
-                f"https://ddragon.leagueoflegends.com/cdn/{ddragon_version}/img/champion/{champ_key}.png",
-                width=100
-            )
+            st.markdown(f"<img src='{champion_icon(champ_key, ddragon_version)}' width='100' />",
+                        unsafe_allow_html=True)
         else:
             st.write("❓")
     
@@ -731,7 +2292,7 @@ def create_champion_card(champ_data, role_color, champion_data, champ_mapping, d
     # Extra spacing
     st.write("")
 
-def create_champion_row(champ_data, role_color, champion_data, champ_mapping, ddragon_version):
+def create_champion_row(champ_data, role_color, champion_data, champ_resolver, ddragon_version):
     """Create a compact champion row for detailed view"""
     champion_name = champ_data["champion"]
     win_rate = champ_data["win_rate"]
@@ -739,14 +2300,15 @@ def create_champion_row(champ_data, role_color, champion_data, champ_mapping, dd
     wins = champ_data["wins"]
     losses = champ_data["losses"]
     
-    champ_key = find_champion_key(champion_name, champion_data, champ_mapping)
+    champ_key = champ_resolver.resolve(champion_name)
     wr_color = "#10b981" if win_rate >= 60 else "#f59e0b" if win_rate >= 40 else "#ef4444"
     
     col1, col2, col3, col4 = st.columns([1, 3, 2, 2])
     
     with col1:
         if champ_key:
-            st.image(f"https://ddragon.leagueoflegends.com/cdn/{ddragon_version}/img/champion/{champ_key}.png", width=50)
+            st.markdown(f"<img src='{champion_icon(champ_key, ddragon_version)}' width='50' />",
+                        unsafe_allow_html=True)
         else:
             st.markdown(f"""
             <div style="width: 50px; height: 50px; background: #334155; border-radius: 8px; 
@@ -764,7 +2326,7 @@ def create_champion_row(champ_data, role_color, champion_data, champ_mapping, dd
     with col4:
         st.markdown(f"**{wins}W - {losses}L** ({games}g)")
 
-def create_threat_card(champ_data, threat_color, champion_data, champ_mapping, ddragon_version):
+def create_threat_card(champ_data, threat_color, champion_data, champ_resolver, ddragon_version):
     """Create a simple threat card with icon and info in dark area"""
     champion_name = champ_data["champion"]
     win_rate = champ_data["win_rate"]
@@ -772,7 +2334,7 @@ def create_threat_card(champ_data, threat_color, champion_data, champ_mapping, d
     wins = champ_data["wins"]
     losses = champ_data["losses"]
     
-    champ_key = find_champion_key(champion_name, champion_data, champ_mapping)
+    champ_key = champ_resolver.resolve(champion_name)
     
     # Determine threat level
     if win_rate >= 70:
@@ -789,10 +2351,8 @@ def create_threat_card(champ_data, threat_color, champion_data, champ_mapping, d
     if champ_key:
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
-            st.image(
-                f"https://ddragon.leagueoflegends.com/cdn/{ddragon_version}/img/champion/{champ_key}.png",
-                width=60
-            )
+            st.markdown(f"<img src='{champion_icon(champ_key, ddragon_version)}' width='60' />",
+                        unsafe_allow_html=True)
     else:
         st.markdown(f"""
         <div style="display: flex; justify-content: center; margin-bottom: 0.75rem;">
@@ -827,521 +2387,602 @@ def create_threat_card(champ_data, threat_color, champion_data, champ_mapping, d
     </div>
     """, unsafe_allow_html=True)
 
-def create_detailed_opponent_table(opponent_data, champion_data, champ_mapping, ddragon_version):
+def create_detailed_opponent_table(opponent_data, champion_data, champ_resolver, ddragon_version):
     """Create a detailed table view of all opponent champions"""
     # Display as rows like the GMB "View All Champions" section
     for champ_data in opponent_data:
-        create_champion_row(champ_data, "#64748b", champion_data, champ_mapping, ddragon_version)
+        create_champion_row(champ_data, "#64748b", champion_data, champ_resolver, ddragon_version)
 
-def create_threat_layout_with_separators(threat_data, threat_color, champion_data, champ_mapping, ddragon_version, max_display=4):
+def create_threat_layout_with_separators(threat_data, threat_color, champion_data, champ_resolver, ddragon_version, max_display=4):
     """Create threat champion layout with vertical separators"""
     num_to_show = min(max_display, len(threat_data))
     
     if num_to_show == 1:
         cols = st.columns([1, 2, 1])
         with cols[1]:
-            create_champion_card(threat_data[0], threat_color, champion_data, champ_mapping, ddragon_version)
+            create_champion_card(threat_data[0], threat_color, champion_data, champ_resolver, ddragon_version)
     elif num_to_show == 2:
         cols = st.columns([2, 1, 2])
         with cols[0]:
-            create_champion_card(threat_data[0], threat_color, champion_data, champ_mapping, ddragon_version)
+            create_champion_card(threat_data[0], threat_color, champion_data, champ_resolver, ddragon_version)
         with cols[1]:
             st.markdown("", unsafe_allow_html=True)  # Separator space
         with cols[2]:
-            create_champion_card(threat_data[1], threat_color, champion_data, champ_mapping, ddragon_version)
+            create_champion_card(threat_data[1], threat_color, champion_data, champ_resolver, ddragon_version)
     elif num_to_show == 3:
         cols = st.columns([3, 1, 3, 1, 3])
         with cols[0]:
-            create_champion_card(threat_data[0], threat_color, champion_data, champ_mapping, ddragon_version)
+            create_champion_card(threat_data[0], threat_color, champion_data, champ_resolver, ddragon_version)
         with cols[1]:
             st.markdown('<div style="border-left: 2px solid #475569; height: 400px; margin: 2rem 0;"></div>', unsafe_allow_html=True)
         with cols[2]:
-            create_champion_card(threat_data[1], threat_color, champion_data, champ_mapping, ddragon_version)
+            create_champion_card(threat_data[1], threat_color, champion_data, champ_resolver, ddragon_version)
         with cols[3]:
             st.markdown('<div style="border-left: 2px solid #475569; height: 400px; margin: 2rem 0;"></div>', unsafe_allow_html=True)
         with cols[4]:
-            create_champion_card(threat_data[2], threat_color, champion_data, champ_mapping, ddragon_version)
+            create_champion_card(threat_data[2], threat_color, champion_data, champ_resolver, ddragon_version)
     elif num_to_show == 4:
         cols = st.columns([2, 1, 2, 1, 2, 1, 2])
         for i in range(4):
             col_index = i * 2  # 0, 2, 4, 6
             with cols[col_index]:
-                create_champion_card(threat_data[i], threat_color, champion_data, champ_mapping, ddragon_version)
+                create_champion_card(threat_data[i], threat_color, champion_data, champ_resolver, ddragon_version)
             # Add separator after first three champions
             if i < 3:
                 with cols[col_index + 1]:
                     st.markdown('<div style="border-left: 2px solid #475569; height: 400px; margin: 2rem 0;"></div>', unsafe_allow_html=True)
 
-# Page routing based on selection
-if page == "Scrims":
-    st.title("Scrims Overview")
+# Scrims detail: draft strip and scoreboard built as one HTML payload per game
+@st.cache_data(max_entries=64, show_spinner=False)
+def render_draft_html(game_id, games_version, asset_version, local_icons, _timeline):
+    """Pick order as a single flex row; cached per game, data version, patch and which of its icons are local"""
+    icons = get_icon_cache()
+    cells = []
+    for pick in _timeline:
+        if pick.champ_key:
+            icon = f"<img src='{icons.src(asset_version, 'champion', pick.champ_key)}' width='60' height='60' style='border-radius:8px;' />"
+        else:
+            icon = "<div class='draft-placeholder'>?</div>"
+        team_color = "#3b82f6" if pick.is_gmb else "#ef4444"
+        cells.append(f"""
+        <div class='draft-pick'>
+            {icon}
+            <div style='text-align:center; margin-top:0.5rem;'>
+                <div style='background:{team_color}; color:white; padding:0.25rem 0.5rem; 
+                border-radius:6px; font-weight:600; font-size:0.8rem; margin-bottom:0.25rem;'>
+                    {pick.pick_code}
+                </div>
+                <div style='font-size:0.75rem; color:var(--text-secondary);'>
+                    {html.escape(pick.champion)}
+                </div>
+            </div>
+        </div>""")
+    return f"<div class='draft-strip'>{''.join(cells)}</div>"
+
+def draft_icons(timeline):
+    """(kind, name) of every icon render_draft_html shows"""
+    return [("champion", pick.champ_key) for pick in timeline if pick.champ_key]
+
+def scoreboard_icons(game, assets):
+    """(kind, name) of every icon render_scoreboard_html shows"""
+    icons = []
+    for item_data in game["final_items"].values():
+        champ_key = assets.resolver.resolve(item_data.get("champion"))
+        if champ_key:
+            icons.append(("champion", champ_key))
+        icons.extend(("item", item_id) for item_id in item_data.get("items", [])[:6] if item_id > 0)
+        if item_data.get("trinket", 0) > 0:
+            icons.append(("item", item_data["trinket"]))
+    return icons
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def render_scoreboard_html(game_id, games_version, asset_version, local_icons, _game, _assets):
+    """Both teams' final items as a single two-column grid; cached like render_draft_html"""
+    icons = get_icon_cache()
+    try:
+        player_gold = get_item_tables()["player_gold"].xs(game_id, level="game_id")
+    except KeyError:
+        player_gold = pd.Series(dtype="int64")
+    gmb_team_id = _game.get("gmb_team_id")
+    teams = {True: [], False: []}
+    for player, item_data in _game["final_items"].items():
+        teams[item_data.get("team_id") == gmb_team_id].append((player, item_data))
+
+    columns = []
+    for is_gmb, title, name_style, trinket_border in (
+        (True, "GMB Final Items", "", "var(--accent-primary)"),
+        (False, "Opponent Final Items", " style='color: var(--danger);'", "var(--danger)"),
+    ):
+        rows = []
+        for player, item_data in teams[is_gmb]:
+            kda = _game["player_data"].get(player, {}).get("kda", "0/0/0")
+            champ_key = _assets.resolver.resolve(item_data.get("champion"))
+            icon = f"<img src='{icons.src(_assets.version, 'champion', champ_key)}' width='60' style='border-radius:8px;' />" if champ_key else ""
+            gold_label = f"{player_gold[player]:,}g in items" if player in player_gold.index else ""
+            items = [
+                f"<img src='{icons.src(_assets.version, 'item', item_id)}' title='{_assets.items.tooltip(item_id)}' width='35' "
+                "style='margin:2px; border-radius:4px; border:1px solid var(--border);' />"
+                for i, item_id in enumerate(item_data.get("items", [])) if i < 6 and item_id > 0
+            ]
+            trinket_id = item_data.get("trinket", 0)
+            if trinket_id > 0:
+                items.append(
+                    f"<img src='{icons.src(_assets.version, 'item', trinket_id)}' title='{_assets.items.tooltip(trinket_id)}' width='35' "
+                    f"style='margin:2px 2px 2px 8px; border-radius:4px; border:2px solid {trinket_border};' />"
+                )
+            rows.append(f"""
+            <div class="player-items-row">
+                <div class="champion-section">
+                    {icon}
+                    <div class="player-info-section">
+                        <div class="player-name"{name_style}>{html.escape(player)}</div>
+                        <div class="player-score">{html.escape(kda)}</div>
+                        <div class="player-score">{gold_label}</div>
+                    </div>
+                </div>
+                <div class="items-section">{''.join(items)}</div>
+            </div>""")
+        columns.append(f"<div><h3>{title}</h3>{''.join(rows)}</div>")
+    return f"<div class='scoreboard'>{''.join(columns)}</div>"
+
+# Scrims page, split into fragments so a filter change reruns only the page body
+@st.fragment
+def scrim_browser():
+    """Filter panel, scrim selector and the selected game; reruns on its own when a filter or the selection changes"""
+    scrim_filter = get_scrim_filter()
     
-    if not games:
-        st.warning("No games found in database. Please import game data first.")
-    else:
-        # Create games table for listing
-        games_df = pd.DataFrame([
-            {
-                "id": str(game.get("_id")),
-                "date": game.get("date"),
-                "opponent": game.get("opponent_team", {}).get("name", "Unknown"),
-                "result": "WIN" if game.get("win") else "LOSS",
-                "side": game.get("gmb_side", "").upper(),
-                "duration": game.get("game_duration", "0:00")
-            } for game in games
-        ])
-        
-        # Enhanced filtering section
-        with st.container():
+    # Enhanced filtering section
+    with st.container():
 
-            st.subheader("Find a Scrim")
+        st.subheader("Find a Scrim")
+        
+        # Free-text search over the per-version index, ranked best first
+        search_query = st.text_input("Search", placeholder="e.g. vs Karmine Azir", key="scrim_search",
+                                     help="Opponent, player, champion (either side) or date; words can be prefixes")
+        search_results = get_search_index().search(search_query)
+        
+        # Champions for filtering, from the per-version champion index
+        champion_index = get_champion_index()
+        gmb_champions_list = ["All"] + sorted(champion_index["allied"])
+        enemy_champions_list = ["All"] + sorted(champion_index["enemy"])
+        
+        col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
+        
+        with col1:
+            # Date filtering
+            date_range = st.date_input("Date Range", 
+                                       value=list(scrim_filter.date_range) if scrim_filter.date_range else [],
+                                       key="date_filter")
+            if scrim_filter.undated:
+                st.caption(f"{scrim_filter.undated} scrim(s) without a readable date are listed whatever the range.")
             
-            # Extract all champions for filtering
-            all_gmb_champions = set()
-            all_enemy_champions = set()
-            gmb_player_names = ["ILYXOU", "Goliah", "iwanan", "Marth", "Mahonix"]
+            # Result filter
+            result_filter = st.radio("Result", ["All", "WIN", "LOSS"])
+        
+        with col2:
+            # Side filter
+            side_filter = st.radio("Side", ["All", "BLUE", "RED"])
             
-            for game in games:
-                gmb_team_id = game.get("gmb_team_id")
-                if "final_items" in game:
-                    for player, item_data in game["final_items"].items():
-                        champion = item_data.get("champion", "")
-                        team_id = item_data.get("team_id")
-                        
-                        if champion:  # Only add if champion name exists
-                            # Check if this is a GMB player
-                            is_gmb_player = any(player.upper() == gmb_name.upper() for gmb_name in gmb_player_names)
-                            
-                            if is_gmb_player and team_id == gmb_team_id:
-                                all_gmb_champions.add(champion)
-                            elif team_id != gmb_team_id:
-                                all_enemy_champions.add(champion)
+            # Opponent filter
+            opponents = ["All"] + scrim_filter.opponents
+            opponent_filter = st.selectbox("Opponent", opponents)
+        
+        with col3:
+            # Champion filters
+            st.markdown("**Champion Filters**")
+            allied_champion_filter = st.selectbox("Allied Champion", gmb_champions_list, 
+                                                 help="Filter games where GMB played this champion")
+            enemy_champion_filter = st.selectbox("Enemy Champion", enemy_champions_list,
+                                                help="Filter games where opponent played this champion")
+        
+        with col4:
+            # Apply filters
+            # Empty when the table has no dates or the field was cleared, one date while a range is being picked
+            date_bounds = None
+            if isinstance(date_range, (tuple, list)) and len(date_range) == 2:
+                start_date, end_date = date_range
+                date_bounds = (str(start_date), str(end_date))
             
-            # Sort champion lists
-            gmb_champions_list = ["All"] + sorted(list(all_gmb_champions))
-            enemy_champions_list = ["All"] + sorted(list(all_enemy_champions))
+            # Champion filters narrow to the intersection of indexed game sets
+            game_ids = None
+            if allied_champion_filter != "All":
+                game_ids = champion_index["allied"].get(allied_champion_filter, frozenset())
+            if enemy_champion_filter != "All":
+                enemy_ids = champion_index["enemy"].get(enemy_champion_filter, frozenset())
+                game_ids = enemy_ids if game_ids is None else game_ids & enemy_ids
+            if search_results is not None:
+                game_ids = frozenset(search_results) if game_ids is None else game_ids & frozenset(search_results)
             
-            col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
+            # One mask over the typed scrim table, then page through the matches, newest first or by search rank
+            scrim_filters = (date_bounds, result_filter, side_filter, opponent_filter, game_ids)
+            matching_games = scrim_filter.filter(scrim_filters)
+            if search_results:
+                search_rank = pd.Index(search_results).get_indexer(matching_games["id"])
+                matching_games = matching_games.iloc[np.argsort(search_rank, kind="stable")]
+            total_scrims = len(matching_games)
             
-            with col1:
-                # Date filtering
-                min_date = games_df["date"].min() if not games_df.empty else ""
-                max_date = games_df["date"].max() if not games_df.empty else ""
-                date_range = st.date_input("Date Range", 
-                                           value=[min_date, max_date] if min_date and max_date else None,
-                                           key="date_filter")
-                
-                # Result filter
-                result_filter = st.radio("Result", ["All", "WIN", "LOSS"])
+            # Or count and page on the server with a cursor, falling back to the synced table when Mongo is unreachable
+            server_paging = st.toggle("Server-side paging", value=False,
+                                      help="Page through MongoDB with a cursor instead of the synced games (newest first)")
+            server_filters = (date_bounds, result_filter, side_filter, opponent_filter,
+                              tuple(sorted(game_ids)) if game_ids is not None else None)
+            games_version = get_data_version()[0]
+            if server_paging:
+                try:
+                    total_scrims = count_scrims(server_filters, games_version)
+                except pymongo.errors.PyMongoError:
+                    st.caption("MongoDB is unreachable, paging the synced games instead.")
+                    server_paging = False
             
-            with col2:
-                # Side filter
-                side_filter = st.radio("Side", ["All", "BLUE", "RED"])
-                
-                # Opponent filter
-                opponents = ["All"] + sorted(list(set(games_df["opponent"].tolist())))
-                opponent_filter = st.selectbox("Opponent", opponents)
+            page_size = st.select_slider("Scrims per page", options=SCRIM_PAGE_SIZES, value=SCRIM_PAGE_SIZES[1])
+            page_count = max(1, -(-total_scrims // page_size))
             
-            with col3:
-                # Champion filters
-                st.markdown("**Champion Filters**")
-                allied_champion_filter = st.selectbox("Allied Champion", gmb_champions_list, 
-                                                     help="Filter games where GMB played this champion")
-                enemy_champion_filter = st.selectbox("Enemy Champion", enemy_champions_list,
-                                                    help="Filter games where opponent played this champion")
+            # A ?game=<id> link opens on that scrim once; after that the selector drives the link
+            linked_id = st.query_params.get("game")
+            if linked_id and linked_id != st.session_state.get("linked_game"):
+                st.session_state["linked_game"] = linked_id
+                linked_rows = np.flatnonzero(matching_games["id"].to_numpy() == linked_id)
+                if len(linked_rows):
+                    st.session_state["scrim_page"] = min(int(linked_rows[0]) // page_size + 1, page_count)
+                    st.session_state["scrim_select"] = linked_id
             
-            with col4:
-                # Apply filters
-                filtered_games = games_df.copy()
-                
-                # Date filter
-                if len(date_range) == 2:
-                    try:
-                        start_date, end_date = date_range
-                        filtered_games = filtered_games[(filtered_games["date"] >= str(start_date)) & 
-                                                       (filtered_games["date"] <= str(end_date))]
-                    except:
-                        pass
-                
-                # Basic filters
-                if result_filter != "All":
-                    filtered_games = filtered_games[filtered_games["result"] == result_filter]
-                if side_filter != "All":
-                    filtered_games = filtered_games[filtered_games["side"] == side_filter]
-                if opponent_filter != "All":
-                    filtered_games = filtered_games[filtered_games["opponent"] == opponent_filter]
+            page_number = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, step=1, key="scrim_page")
+            filtered_games = None
+            if server_paging:
+                try:
+                    filtered_games = scrim_page_frame(
+                        load_scrim_page(server_filters, page_number - 1, page_size, games_version), scrim_filter
+                    )
+                except pymongo.errors.PyMongoError:
+                    st.caption("MongoDB is unreachable, paging the synced games instead.")
+            if filtered_games is None:
+                filtered_games = matching_games.iloc[(page_number - 1) * page_size:page_number * page_size]
+            
+            # Game selection
+            if not filtered_games.empty:
+                game_ids = filtered_games["id"].tolist()
+                game_options = dict(zip(game_ids, filtered_games["label"]))
                 
-                # Champion filters - need to check actual game data
-                if allied_champion_filter != "All" or enemy_champion_filter != "All":
-                    valid_game_ids = []
-                    
-                    for game in games:
-                        game_id = str(game.get("_id"))
-                        gmb_team_id = game.get("gmb_team_id")
-                        
-                        # Check if this game matches current filters (before champion filter)
-                        if game_id not in filtered_games["id"].values:
-                            continue
-                        
-                        gmb_champions_in_game = set()
-                        enemy_champions_in_game = set()
-                        
-                        if "final_items" in game:
-                            for player, item_data in game["final_items"].items():
-                                champion = item_data.get("champion", "")
-                                team_id = item_data.get("team_id")
-                                
-                                if champion:
-                                    is_gmb_player = any(player.upper() == gmb_name.upper() for gmb_name in gmb_player_names)
-                                    
-                                    if is_gmb_player and team_id == gmb_team_id:
-                                        gmb_champions_in_game.add(champion)
-                                    elif team_id != gmb_team_id:
-                                        enemy_champions_in_game.add(champion)
-                        
-                        # Check champion filters
-                        allied_match = (allied_champion_filter == "All" or 
-                                      allied_champion_filter in gmb_champions_in_game)
-                        enemy_match = (enemy_champion_filter == "All" or 
-                                     enemy_champion_filter in enemy_champions_in_game)
-                        
-                        if allied_match and enemy_match:
-                            valid_game_ids.append(game_id)
-                    
-                    # Filter dataframe to only include games that match champion criteria
-                    filtered_games = filtered_games[filtered_games["id"].isin(valid_game_ids)]
+                selected_id = st.selectbox("Select a Scrim", 
+                                           game_ids,
+                                           format_func=game_options.get,
+                                           key="scrim_select")
+                selected_index = game_ids.index(selected_id)
+                st.query_params["game"] = selected_id
+                st.session_state["linked_game"] = selected_id
                 
-                # Game selection
-                if not filtered_games.empty:
-                    game_options = [f"{row['date']} | {row['opponent']} ({row['result']}, {row['side']} side)" 
-                                  for _, row in filtered_games.iterrows()]
-                    
-                    selected_index = st.selectbox("Select a Scrim", 
-                                                range(len(game_options)),
-                                                format_func=lambda i: game_options[i])
-                    
-                    selected_id = filtered_games.iloc[selected_index]["id"]
-                    
-                    # Display selection summary with champion info
-                    selected_row = filtered_games.iloc[selected_index]
-                    result_color = "#10b981" if selected_row['result'] == "WIN" else "#ef4444"
-                    
-                    # Add champion info to summary if filters are active
-                    champion_info = ""
-                    if allied_champion_filter != "All":
-                        champion_info += f" • Allied: {allied_champion_filter}"
-                    if enemy_champion_filter != "All":
-                        champion_info += f" • Enemy: {enemy_champion_filter}"
-                    
-                    st.markdown(f"""
-                    <div style="background: rgba(51, 65, 85, 0.3); padding: 1rem; border-radius: 8px; margin-top: 1rem; border-left: 4px solid {result_color};">
-                        <strong>Selected:</strong> {selected_row['date']} vs {selected_row['opponent']} • 
-                        <span style="color: {result_color}; font-weight: 600;">{selected_row['result']}</span> • 
-                        {selected_row['side']} side • Duration: {selected_row['duration']}{champion_info}
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.warning("No scrims match the selected filters.")
-                    selected_id = None
-        
-        # Game details section
-        if selected_id:
-            game = next((g for g in games if str(g.get("_id")) == selected_id), None)
-            
-            if game:
-                st.header("Game Details")
+                # Display selection summary with champion info
+                selected_row = filtered_games.iloc[selected_index]
+                result_color = "#10b981" if selected_row['result'] == "WIN" else "#ef4444"
                 
-                # Game header with enhanced styling
-                result_color = "#10b981" if game.get("win") else "#ef4444"
-                result_text = "VICTORY" if game.get("win") else "DEFEAT"
+                # Add champion info to summary if filters are active
+                champion_info = ""
+                if allied_champion_filter != "All":
+                    champion_info += f" • Allied: {allied_champion_filter}"
+                if enemy_champion_filter != "All":
+                    champion_info += f" • Enemy: {enemy_champion_filter}"
                 
                 st.markdown(f"""
-                <div class="modern-card" style="text-align: center; padding: 2rem;">
-                    <h2 style="margin: 0; color: {result_color}; font-size: 2.5rem; text-shadow: 0 0 20px {result_color}50;">
-                        {result_text}
-                    </h2>
-                    <h3 style="margin: 0.5rem 0 0 0; color: #94a3b8;">
-                        vs {game.get('opponent_team', {}).get('name', 'Unknown')}
-                    </h3>
+                <div style="background: rgba(51, 65, 85, 0.3); padding: 1rem; border-radius: 8px; margin-top: 1rem; border-left: 4px solid {result_color};">
+                    <strong>Selected:</strong> {selected_row['date_text']} vs {selected_row['opponent']} • 
+                    <span style="color: {result_color}; font-weight: 600;">{selected_row['result']}</span> • 
+                    {selected_row['side']} side • Duration: {selected_row['duration']}{champion_info}
                 </div>
                 """, unsafe_allow_html=True)
-                
-                # Game metadata with modern cards
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    styled_metric("Date", game.get('date'))
-                    styled_metric("Duration", game.get('game_duration', '0:00'))
-                
-                with col2:
-                    styled_metric("Side", game.get('gmb_side', '').upper())
-                    # Simplified first blood - just show team (no time)
-                    first_blood = game.get('first_blood', {})
-                    if first_blood.get('team'):
-                        fb_team = "GMB" if first_blood.get('team') == "GMB" else "Opponent"
-                        styled_metric("First Blood", fb_team)
-                
-                with col3:
-                    # Objectives with enhanced display
-                    gmb_objectives = game.get('objectives', {}).get('blue_team' if game.get('gmb_side') == 'blue' else 'red_team', {}).get('objectives', {})
-                    enemy_objectives = game.get('objectives', {}).get('red_team' if game.get('gmb_side') == 'blue' else 'blue_team', {}).get('objectives', {})
-                    
-                    dragons_gmb = gmb_objectives.get('dragon', {}).get('kills', 0)
-                    dragons_enemy = enemy_objectives.get('dragon', {}).get('kills', 0)
-                    styled_metric("Dragons", f"{dragons_gmb} - {dragons_enemy}")
-                    
-                    barons_gmb = gmb_objectives.get('baron', {}).get('kills', 0)
-                    barons_enemy = enemy_objectives.get('baron', {}).get('kills', 0)
-                    styled_metric("Barons", f"{barons_gmb} - {barons_enemy}")
-                
-                # Enhanced Draft Section
-                st.header("Draft Analysis")
-                if "draft" in game:
-                    pick_order = game["draft"].get("pick_order", [])
-                    
-                    if pick_order:
-                        pick_order.sort(key=lambda x: x.get("sequence_number", 99) if x.get("sequence_number") is not None else 99)
-                        
+            else:
+                st.warning("No scrims match the selected filters.")
+                selected_id = None
+    
+    # Game details section
+    if selected_id:
+        game_detail(selected_id)
 
-                        st.subheader("Pick Order")
-                        
-                        # Create draft visualization
-                        cols = st.columns(len(pick_order))
-                        
-                        for i, pick in enumerate(pick_order):
-                            team = pick.get("team", "")
-                            champion = pick.get("champion", "")
-                            is_gmb = "GMB" in team or team == "GMBLERS Esports"
-                            
-                            sequence = pick.get("sequence_number", i + 1)
-                            pick_labels = {
-                                1: "B1", 2: "R1", 3: "R2", 4: "B2", 5: "B3",
-                                6: "R3", 7: "R4", 8: "B4", 9: "B5", 10: "R5"
-                            }
-                            pick_code = pick_labels.get(sequence, f"Pick {sequence}")
-                            
-                            with cols[i]:
-                                champ_key = find_champion_key(champion, champion_data, champ_mapping)
-                                if champ_key:
-                                    st.image(
-                                        f"https://ddragon.leagueoflegends.com/cdn/{ddragon_version}/img/champion/{champ_key}.png", 
-                                        width=60,
-                                        use_container_width=False
-                                    )
-                                else:
-                                    st.markdown(f"""
-                                    <div style='height:60px;width:60px;background:linear-gradient(135deg, var(--bg-card), var(--bg-secondary));
-                                    border-radius:8px;display:flex;align-items:center;justify-content:center;margin:0 auto;
-                                    border:2px solid var(--border);'>
-                                        <span style='color:white;font-size:1.2rem;'>?</span>
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                                
-                                team_color = "#3b82f6" if is_gmb else "#ef4444"
-                                st.markdown(f"""
-                                <div style='text-align:center; margin-top:0.5rem;'>
-                                    <div style='background:{team_color}; color:white; padding:0.25rem 0.5rem; 
-                                    border-radius:6px; font-weight:600; font-size:0.8rem; margin-bottom:0.25rem;'>
-                                        {pick_code}
-                                    </div>
-                                    <div style='font-size:0.75rem; color:var(--text-secondary);'>
-                                        {champion}
-                                    </div>
-                                </div>
-                                """, unsafe_allow_html=True)
-                        
-                        st.markdown('</div>', unsafe_allow_html=True)
-                
-                # Enhanced Final Items Section with new layout: Champion -> Items -> Name/KDA under champion
-                st.header("Scoreboard")
-                if "final_items" in game and "player_data" in game:
-                    gmb_team_id = game.get("gmb_team_id")
-                    gmb_player_items = []
-                    opponent_player_items = []
-                    
-                    for player, item_data in game["final_items"].items():
-                        # Get player KDA from game data
-                        player_stats = game["player_data"].get(player, {})
-                        kda = player_stats.get("kda", "0/0/0")
-                        
-                        if item_data.get("team_id") == gmb_team_id:
-                            gmb_player_items.append((player, item_data, kda))
-                        else:
-                            opponent_player_items.append((player, item_data, kda))
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.subheader("GMB Final Items")
-                        
-                        for player, item_data, kda in gmb_player_items:
-                            champ_name = item_data.get("champion")
-                            champ_key = find_champion_key(champ_name, champion_data, champ_mapping)
-                            
-                            st.markdown('<div class="player-items-row">', unsafe_allow_html=True)
-                            
-                            # Layout: Champion section (icon + name/KDA below) | Items section
-                            champion_col, items_col = st.columns([1, 4])
-                            
-                            with champion_col:
-                                # Champion icon
-                                if champ_key:
-                                    st.image(
-                                        f"https://ddragon.leagueoflegends.com/cdn/{ddragon_version}/img/champion/{champ_key}.png", 
-                                        width=60
-                                    )
-                                
-                                # Player info under champion
-                                st.markdown(f"""
-                                <div class="player-info-section">
-                                    <div class="player-name">{player}</div>
-                                    <div class="player-score">{kda}</div>
-                                </div>
-                                """, unsafe_allow_html=True)
-                            
-                            with items_col:
-                                # Items right after champion
-                                items_html = '<div class="items-section">'
-                                for i, item_id in enumerate(item_data.get("items", [])):
-                                    if i < 6 and item_id > 0:
-                                        items_html += f'<img src="https://ddragon.leagueoflegends.com/cdn/{ddragon_version}/img/item/{item_id}.png" width="35" style="margin:2px; border-radius:4px; border:1px solid var(--border);" />'
-                                
-                                trinket_id = item_data.get("trinket", 0)
-                                if trinket_id > 0:
-                                    items_html += f'<img src="https://ddragon.leagueoflegends.com/cdn/{ddragon_version}/img/item/{trinket_id}.png" width="35" style="margin:2px 2px 2px 8px; border-radius:4px; border:2px solid var(--accent-primary);" />'
-                                
-                                items_html += '</div>'
-                                st.markdown(items_html, unsafe_allow_html=True)
-                            
-                            st.markdown('</div>', unsafe_allow_html=True)
-                    
-                    with col2:
-                        st.subheader("Opponent Final Items")
-                        
-                        for player, item_data, kda in opponent_player_items:
-                            champ_name = item_data.get("champion")
-                            champ_key = find_champion_key(champ_name, champion_data, champ_mapping)
-                            
-                            st.markdown('<div class="player-items-row">', unsafe_allow_html=True)
-                            
-                            # Layout: Champion section (icon + name/KDA below) | Items section
-                            champion_col, items_col = st.columns([1, 4])
-                            
-                            with champion_col:
-                                # Champion icon
-                                if champ_key:
-                                    st.image(
-                                        f"https://ddragon.leagueoflegends.com/cdn/{ddragon_version}/img/champion/{champ_key}.png", 
-                                        width=60
-                                    )
-                                
-                                # Player info under champion
-                                st.markdown(f"""
-                                <div class="player-info-section">
-                                    <div class="player-name" style="color: var(--danger);">{player}</div>
-                                    <div class="player-score">{kda}</div>
-                                </div>
-                                """, unsafe_allow_html=True)
-                            
-                            with items_col:
-                                # Items right after champion
-                                items_html = '<div class="items-section">'
-                                for i, item_id in enumerate(item_data.get("items", [])):
-                                    if i < 6 and item_id > 0:
-                                        items_html += f'<img src="https://ddragon.leagueoflegends.com/cdn/{ddragon_version}/img/item/{item_id}.png" width="35" style="margin:2px; border-radius:4px; border:1px solid var(--border);" />'
-                                
-                                trinket_id = item_data.get("trinket", 0)
-                                if trinket_id > 0:
-                                    items_html += f'<img src="https://ddragon.leagueoflegends.com/cdn/{ddragon_version}/img/item/{trinket_id}.png" width="35" style="margin:2px 2px 2px 8px; border-radius:4px; border:2px solid var(--danger);" />'
-                                
-                                items_html += '</div>'
-                                st.markdown(items_html, unsafe_allow_html=True)
-                            
-                            st.markdown('</div>', unsafe_allow_html=True)
-                
-                # Enhanced Player Performance
-                st.header("Player Performance")
+@st.fragment
+def game_detail(selected_id):
+    """Detail view for one scrim, driven only by its id"""
+    game = get_game_detail(selected_id)
+    
+    if game:
+        # Champion, item and icon data from the game's own patch
+        game_assets = get_ddragon_datasets().for_game(game)
+        games_version = get_data_version()[0]
+        st.header("Game Details")
+        
+        # Game header with enhanced styling
+        result_color = "#10b981" if game.get("win") else "#ef4444"
+        result_text = "VICTORY" if game.get("win") else "DEFEAT"
+        
+        st.markdown(f"""
+        <div class="modern-card" style="text-align: center; padding: 2rem;">
+            <h2 style="margin: 0; color: {result_color}; font-size: 2.5rem; text-shadow: 0 0 20px {result_color}50;">
+                {result_text}
+            </h2>
+            <h3 style="margin: 0.5rem 0 0 0; color: #94a3b8;">
+                vs {game.get('opponent_team', {}).get('name', 'Unknown')}
+            </h3>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Game metadata with modern cards
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            styled_metric("Date", game.get('date'))
+            styled_metric("Duration", game.get('game_duration', '0:00'))
+        
+        with col2:
+            styled_metric("Side", game.get('gmb_side', '').upper())
+            # Simplified first blood - just show team (no time)
+            first_blood = game.get('first_blood', {})
+            if first_blood.get('team'):
+                fb_team = "GMB" if first_blood.get('team') == "GMB" else "Opponent"
+                styled_metric("First Blood", fb_team)
+        
+        with col3:
+            # Objectives with enhanced display
+            gmb_objectives = game.get('objectives', {}).get('blue_team' if game.get('gmb_side') == 'blue' else 'red_team', {}).get('objectives', {})
+            enemy_objectives = game.get('objectives', {}).get('red_team' if game.get('gmb_side') == 'blue' else 'blue_team', {}).get('objectives', {})
+            
+            dragons_gmb = gmb_objectives.get('dragon', {}).get('kills', 0)
+            dragons_enemy = enemy_objectives.get('dragon', {}).get('kills', 0)
+            styled_metric("Dragons", f"{dragons_gmb} - {dragons_enemy}")
+            
+            barons_gmb = gmb_objectives.get('baron', {}).get('kills', 0)
+            barons_enemy = enemy_objectives.get('baron', {}).get('kills', 0)
+            styled_metric("Barons", f"{barons_gmb} - {barons_enemy}")
+        
+        # Enhanced Draft Section
+        st.header("Draft Analysis")
+        if "draft" in game:
+            timeline = get_draft_timeline(selected_id, game, game_assets)
+            
+            if timeline:
+                st.subheader("Pick Order")
+                local_icons = get_icon_cache().local(game_assets.version, draft_icons(timeline))
+                st.markdown(render_draft_html(selected_id, games_version, game_assets.version, local_icons, timeline),
+                            unsafe_allow_html=True)
+        
+        # Final items per player, both teams in one block
+        st.header("Scoreboard")
+        if "final_items" in game and "player_data" in game:
+            local_icons = get_icon_cache().local(game_assets.version, scoreboard_icons(game, game_assets))
+            st.markdown(render_scoreboard_html(selected_id, games_version, game_assets.version, local_icons,
+                                               game, game_assets),
+                        unsafe_allow_html=True)
+        
+        # Enhanced Player Performance
+        st.header("Player Performance")
+        
+        if "player_data" in game and "player_positions" in game:
+            # Roster tags from ingest; the registry covers games not in the store yet
+            game_participants = get_game_repository().participants(selected_id)
+            if game_participants.empty:
+                roster = get_roster()
+                roster_players = {player for player in game["player_data"] if roster.lookup(player, game.get("date"))}
+            else:
+                roster_players = set(game_participants.loc[game_participants["roster_player"].notna(), "player"].astype(str))
+            gmb_players = []
+            opponent_players = []
+            
+            for player, stats in game["player_data"].items():
+                player_data = {
+                    "Player": player,
+                    "KDA": stats.get("kda", "0/0/0"),
+                    "Gold@15": stats.get("gold_15min", 0),
+                    "CS@15": stats.get("cs_15min", 0),
+                    "Gold Diff@15": stats.get("gold_diff_15min", 0),
+                    "CS Diff@15": stats.get("cs_diff_15min", 0)
+                }
                 
-                if "player_data" in game and "player_positions" in game:
-                    gmb_player_names = ["ILYXOU", "Goliah", "iwanan", "Marth", "Mahonix"]
-                    gmb_players = []
-                    opponent_players = []
-                    
-                    for player, stats in game["player_data"].items():
-                        player_data = {
-                            "Player": player,
-                            "KDA": stats.get("kda", "0/0/0"),
-                            "Gold@15": stats.get("gold_15min", 0),
-                            "CS@15": stats.get("cs_15min", 0),
-                            "Gold Diff@15": stats.get("gold_diff_15min", 0),
-                            "CS Diff@15": stats.get("cs_diff_15min", 0)
-                        }
-                        
-                        if player in gmb_player_names or player.upper() in [p.upper() for p in gmb_player_names]:
-                            gmb_players.append(player_data)
-                        else:
-                            opponent_players.append(player_data)
-                    
-                    column_config = {
-                        "Gold Diff@15": st.column_config.NumberColumn(
-                            "Gold Diff@15",
-                            help="Gold difference at 15 minutes",
-                            format="%d"
-                        ),
-                        "CS Diff@15": st.column_config.NumberColumn(
-                            "CS Diff@15",
-                            help="CS difference at 15 minutes",
-                            format="%.1f"
-                        ),
-                    }
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        if gmb_players:
-                            st.markdown('<div class="dataframe-container">', unsafe_allow_html=True)
-                            st.subheader("GMBLERS Players")
-                            gmb_df = pd.DataFrame(gmb_players)
-                            st.dataframe(
-                                gmb_df,
-                                column_config=column_config,
-                                hide_index=True,
-                                use_container_width=True
-                            )
-                            st.markdown('</div>', unsafe_allow_html=True)
-                    
-                    with col2:
-                        if opponent_players:
-                            st.markdown('<div class="dataframe-container">', unsafe_allow_html=True)
-                            st.subheader("Opponent Players")
-                            opponent_df = pd.DataFrame(opponent_players)
-                            st.dataframe(
-                                opponent_df,
-                                column_config=column_config,
-                                hide_index=True,
-                                use_container_width=True
-                            )
-                            st.markdown('</div>', unsafe_allow_html=True)
+                if player in roster_players:
+                    gmb_players.append(player_data)
+                else:
+                    opponent_players.append(player_data)
+            
+            column_config = {
+                "Gold Diff@15": st.column_config.NumberColumn(
+                    "Gold Diff@15",
+                    help="Gold difference at 15 minutes",
+                    format="%d"
+                ),
+                "CS Diff@15": st.column_config.NumberColumn(
+                    "CS Diff@15",
+                    help="CS difference at 15 minutes",
+                    format="%.1f"
+                ),
+            }
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                if gmb_players:
+                    st.markdown('<div class="dataframe-container">', unsafe_allow_html=True)
+                    st.subheader("GMBLERS Players")
+                    gmb_df = pd.DataFrame(gmb_players)
+                    st.dataframe(
+                        gmb_df,
+                        column_config=column_config,
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                    st.markdown('</div>', unsafe_allow_html=True)
+            
+            with col2:
+                if opponent_players:
+                    st.markdown('<div class="dataframe-container">', unsafe_allow_html=True)
+                    st.subheader("Opponent Players")
+                    opponent_df = pd.DataFrame(opponent_players)
+                    st.dataframe(
+                        opponent_df,
+                        column_config=column_config,
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                    st.markdown('</div>', unsafe_allow_html=True)
+
+def select_opponent_block():
+    """Preselect every scrim against the chosen opponent"""
+    opponent = st.session_state["compare_opponent"]
+    if opponent != "None":
+        frame = get_scrim_filter().frame
+        st.session_state["compare_games"] = frame.loc[frame["opponent"] == opponent, "id"].tolist()
+
+@st.fragment
+def scrim_comparison():
+    """Several scrims side by side, read from one slice of the per-game metric tables"""
+    scrim_filter = get_scrim_filter()
+    labels = dict(zip(scrim_filter.frame["id"], scrim_filter.frame["label"]))
+    
+    st.subheader("Compare Scrims")
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        st.selectbox("Opponent block", ["None"] + scrim_filter.opponents, key="compare_opponent",
+                     on_change=select_opponent_block,
+                     help="Select every scrim against this opponent")
+    with col2:
+        selected_ids = st.multiselect("Scrims", list(labels), format_func=labels.get, key="compare_games")
+    
+    if len(selected_ids) < 2:
+        st.info("Select at least two scrims to compare them.")
+        return
+    
+    metrics = get_scrim_metrics()
+    games, players = metrics.compare(selected_ids)
+    
+    # One row per game: result, kills, team diffs at 15 and objective splits
+    st.header("Games")
+    overview = pd.DataFrame({
+        "Game": games["game"],
+        "Date": games["date"],
+        "Opponent": games["opponent"],
+        "Result": games["result"],
+        "Side": games["side"],
+        "Duration": games["duration"],
+        "Kills": games["kills"].fillna(0).astype(int).astype(str) + " - " + games["deaths"].fillna(0).astype(int).astype(str),
+        "Gold Diff@15": games["gold_diff_15min"],
+        "CS Diff@15": games["cs_diff_15min"],
+    })
+    for objective in metrics.objectives:
+        overview[objective.title()] = (games[f"{objective} GMB"].fillna(0).astype(int).astype(str) + " - "
+                                       + games[f"{objective} Opponent"].fillna(0).astype(int).astype(str))
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        styled_metric("Record", f"{(games['result'] == 'WIN').sum()}W - {(games['result'] == 'LOSS').sum()}L")
+    with col2:
+        styled_metric("Avg Gold Diff@15", f"{games['gold_diff_15min'].mean():+.0f}")
+    with col3:
+        styled_metric("Avg CS Diff@15", f"{games['cs_diff_15min'].mean():+.1f}")
+    
+    st.dataframe(
+        overview,
+        column_config={
+            "Gold Diff@15": st.column_config.NumberColumn("Gold Diff@15", format="%+d"),
+            "CS Diff@15": st.column_config.NumberColumn("CS Diff@15", format="%+.1f"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+    
+    # Per role and player, one column per game
+    st.header("Players")
+    shared_roles = players[players.duplicated(["game", "role"], keep=False)]
+    if not shared_roles.empty:
+        st.warning("Several roster players share a role in " + ", ".join(
+            f"{game} ({role}: {', '.join(group['player'])})"
+            for (game, role), group in shared_roles.groupby(["game", "role"], observed=True)
+        ))
+    if (players["role"] == NO_ROLE).any():
+        st.info(f"Roster players without a role in GMB_Players are listed under \"{NO_ROLE}\".")
+    metric = st.radio("Metric", list(COMPARE_PLAYER_METRICS), horizontal=True, key="compare_metric")
+    by_game = players.pivot_table(index=["role", "player"], columns="game", values=COMPARE_PLAYER_METRICS[metric],
+                                  aggfunc="first", observed=True).reindex(columns=games["game"].tolist())
+    st.dataframe(by_game, use_container_width=True)
+    
+    totals = players.groupby(["role", "player"], observed=True).agg(
+        games=("game_id", "size"),
+        wins=("win", "sum"),
+        kills=("kills", "sum"),
+        deaths=("deaths", "sum"),
+        assists=("assists", "sum"),
+        gold_diff_15min=("gold_diff_15min", "mean"),
+        cs_diff_15min=("cs_diff_15min", "mean"),
+    ).reset_index()
+    totals["kda"] = (totals["kills"] + totals["assists"]) / totals["deaths"].clip(lower=1)
+    totals["win_rate"] = totals["wins"] / totals["games"] * 100
+    st.dataframe(
+        totals[["role", "player", "games", "win_rate", "kda", "gold_diff_15min", "cs_diff_15min"]],
+        column_config={
+            "role": "Role",
+            "player": "Player",
+            "games": "Games",
+            "win_rate": st.column_config.NumberColumn("Win Rate", format="%.0f%%"),
+            "kda": st.column_config.NumberColumn("KDA", format="%.2f"),
+            "gold_diff_15min": st.column_config.NumberColumn("Avg Gold Diff@15", format="%+.0f"),
+            "cs_diff_15min": st.column_config.NumberColumn("Avg CS Diff@15", format="%+.1f"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+    
+    # Both teams' picks in draft order
+    st.header("Drafts")
+    st.dataframe(
+        pd.DataFrame({
+            "Game": games["game"],
+            "Side": games["side"],
+            "Result": games["result"],
+            "GMB Picks": games["gmb_picks"],
+            "Opponent Picks": games["opponent_picks"],
+        }),
+        hide_index=True,
+        use_container_width=True
+    )
+
+# Page routing based on selection
+if page == "Scrims":
+    st.title("Scrims Overview")
+    scrim_filter = get_scrim_filter()
+    
+    if scrim_filter.frame.empty:
+        st.warning("No games found in database. Please import game data first.")
+    else:
+        mode = st.radio("Mode", ["Single scrim", "Compare scrims"], horizontal=True, key="scrims_mode")
+        if mode == "Compare scrims":
+            scrim_comparison()
+        else:
+            scrim_browser()
 
 elif page == "Team Stats":
     st.title("Team Statistics")
-    
-    if not games:
+    server_side = st.toggle("Server-side aggregation", value=False,
+                            help="Compute these stats in MongoDB instead of from the loaded games")
+    
+    stats = None
+    if server_side:
+        try:
+            stats = aggregate_team_stats(get_data_version()[0])
+        except pymongo.errors.PyMongoError:
+            st.info("Server-side aggregation is unavailable, using the loaded games instead.")
+    if stats is None:
+        stats = compute_team_stats(get_game_store())
+    
+    if stats["total_games"] == 0:
         st.warning("No games found in database. Please import game data first.")
     else:
         # Calculate stats
-        total_games = len(games)
-        wins = sum(1 for game in games if game.get("win"))
+        total_games = stats["total_games"]
+        wins = stats["wins"]
         losses = total_games - wins
         win_rate = (wins / total_games * 100) if total_games > 0 else 0
         
         # Side stats
-        blue_games = sum(1 for game in games if game.get("gmb_side") == "blue")
-        blue_wins = sum(1 for game in games if game.get("gmb_side") == "blue" and game.get("win"))
+        blue_games = stats["blue_games"]
+        blue_wins = stats["blue_wins"]
         blue_win_rate = (blue_wins / blue_games * 100) if blue_games > 0 else 0
         
-        red_games = sum(1 for game in games if game.get("gmb_side") == "red")
-        red_wins = sum(1 for game in games if game.get("gmb_side") == "red" and game.get("win"))
+        red_games = stats["red_games"]
+        red_wins = stats["red_wins"]
         red_win_rate = (red_wins / red_games * 100) if red_games > 0 else 0
         
         # Modern metrics display
@@ -1363,40 +3004,14 @@ elif page == "Team Stats":
         st.header("Objective Control")
         
         # Calculate objective stats (excluding first blood from dataframe)
-        dragons_total = 0
-        barons_total = 0
-        first_dragon_games = 0
-        first_dragon_wins = 0
-        first_baron_games = 0
-        first_baron_wins = 0
-        first_herald_games = 0
-        first_herald_wins = 0
-        
-        for game in games:
-            gmb_team_data = None
-            if game.get("gmb_side") == "blue" and "objectives" in game:
-                gmb_team_data = game["objectives"].get("blue_team", {})
-            elif game.get("gmb_side") == "red" and "objectives" in game:
-                gmb_team_data = game["objectives"].get("red_team", {})
-            
-            if gmb_team_data and "objectives" in gmb_team_data:
-                dragons_total += gmb_team_data["objectives"].get("dragon", {}).get("kills", 0)
-                barons_total += gmb_team_data["objectives"].get("baron", {}).get("kills", 0)
-                
-                if gmb_team_data["objectives"].get("dragon", {}).get("first", False):
-                    first_dragon_games += 1
-                    if game.get("win"):
-                        first_dragon_wins += 1
-                
-                if gmb_team_data["objectives"].get("baron", {}).get("first", False):
-                    first_baron_games += 1
-                    if game.get("win"):
-                        first_baron_wins += 1
-                
-                if gmb_team_data["objectives"].get("riftHerald", {}).get("first", False):
-                    first_herald_games += 1
-                    if game.get("win"):
-                        first_herald_wins += 1
+        dragons_total = stats["dragons_total"]
+        barons_total = stats["barons_total"]
+        first_dragon_games = stats["first_dragon_games"]
+        first_dragon_wins = stats["first_dragon_wins"]
+        first_baron_games = stats["first_baron_games"]
+        first_baron_wins = stats["first_baron_wins"]
+        first_herald_games = stats["first_herald_games"]
+        first_herald_wins = stats["first_herald_wins"]
         
         # Calculate rates
         first_dragon_rate = (first_dragon_wins / first_dragon_games * 100) if first_dragon_games > 0 else 0
@@ -1481,27 +3096,7 @@ elif page == "Player Stats":
     if not players_db:
         st.warning("No player data found in database.")
     else:
-        # Convert player data
-        players_data = []
-        for player in players_db:
-            players_data.append({
-                "name": player.get("name", "Unknown"),
-                "games_played": player.get("games_played", 0),
-                "avg_gold_15min": player.get("avg_player_data", {}).get("gold_15min", 0),
-                "avg_cs_15min": player.get("avg_player_data", {}).get("cs_15min", 0),
-                "avg_gold_diff_15min": player.get("avg_player_data", {}).get("gold_diff_15min", 0),
-                "avg_cs_diff_15min": player.get("avg_player_data", {}).get("cs_diff_15min", 0),
-                "kda_kills": player.get("avg_player_data", {}).get("kda_kills", 0),
-                "kda_deaths": player.get("avg_player_data", {}).get("kda_deaths", 0),
-                "kda_assists": player.get("avg_player_data", {}).get("kda_assists", 0),
-                "kda_ratio": player.get("avg_player_data", {}).get("kda_ratio", 0),
-                "avg_kda": player.get("avg_player_data", {}).get("kda", "0/0/0"),
-                "avg_control_wards": player.get("avg_control_wards", 0),
-                "avg_vision_score": player.get("avg_challenges", {}).get("vision_score", 0),
-                "avg_damage_per_minute": player.get("avg_challenges", {}).get("damage_per_minute", 0)
-            })
-        
-        players_df = pd.DataFrame(players_data)
+        players_df, challenges_by_name = get_player_table()
         
         # Enhanced player selector
         # st.markdown('<div class="modern-card">', unsafe_allow_html=True)
@@ -1555,11 +3150,7 @@ elif page == "Player Stats":
             # Player Challenges (without visualization)
             st.header("Player Challenges")
             
-            player_challenges = {}
-            for player in players_db:
-                if player.get("name") == selected_player:
-                    player_challenges = player.get("avg_challenges", {})
-                    break
+            player_challenges = challenges_by_name.get(selected_player, {})
             
             if player_challenges:
                 col1, col2, col3 = st.columns(3)
@@ -1582,28 +3173,23 @@ elif page == "Player Stats":
             else:
                 st.warning(f"No challenge data found for player {selected_player}")
             
-            # Game history moved to bottom
-            player_games = []
-            for game in games:
-                if selected_player in game.get("player_data", {}):
-                    player_stats = game["player_data"][selected_player]
-                    player_games.append({
-                        "game_id": str(game.get("_id")),
-                        "date": game.get("date"),
-                        "opponent": game.get("opponent_team", {}).get("name", "Unknown"),
-                        "win": game.get("win", False),
-                        "kda": player_stats.get("kda", "0/0/0"),
-                        "gold_15min": player_stats.get("gold_15min", 0),
-                        "cs_15min": player_stats.get("cs_15min", 0),
-                        "gold_diff_15min": player_stats.get("gold_diff_15min", 0),
-                        "cs_diff_15min": player_stats.get("cs_diff_15min", 0),
-                        "position": game.get("player_positions", {}).get(selected_player, "")
-                    })
+            # Game history moved to bottom; rows and frames from one repository, so one data version
+            repo = get_game_repository()
+            store = repo.store
+            participants = store["participants"]
+            player_games = participants.loc[participants["player"] == selected_player, [
+                "game_id", "kda", "gold_15min", "cs_15min", "gold_diff_15min", "cs_diff_15min", "position"
+            ]]
             
-            if player_games:
+            if not player_games.empty:
                 st.header("Game History")
                 
-                games_df = pd.DataFrame(player_games)
+                game_rows = repo.game_rows(player_games["game_id"])
+                games_df = pd.concat([
+                    store["games"].iloc[game_rows][["game_id", "date", "opponent", "win"]].reset_index(drop=True),
+                    player_games.drop(columns="game_id").reset_index(drop=True),
+                ], axis=1)
+                games_df["scrim"] = "?game=" + games_df["game_id"]
                 games_df = games_df.sort_values("date", ascending=False)
                 
                 st.markdown('<div class="dataframe-container">', unsafe_allow_html=True)
@@ -1618,7 +3204,8 @@ elif page == "Player Stats":
                         "gold_15min": st.column_config.NumberColumn("Gold@15", format="%d"),
                         "cs_15min": st.column_config.NumberColumn("CS@15", format="%.1f"),
                         "gold_diff_15min": st.column_config.NumberColumn("Gold Diff@15", format="%+d"),
-                        "cs_diff_15min": st.column_config.NumberColumn("CS Diff@15", format="%+.1f")
+                        "cs_diff_15min": st.column_config.NumberColumn("CS Diff@15", format="%+.1f"),
+                        "scrim": st.column_config.LinkColumn("Scrim", display_text="Open")
                     },
                     hide_index=True,
                     use_container_width=True
@@ -1627,18 +3214,13 @@ elif page == "Player Stats":
 
 elif page == "Champion Analysis":
     st.title("Champion Analysis")
+    store = get_game_store()
     
-    if not games:
+    if store["games"].empty:
         st.warning("No games found in database. Please import game data first.")
     else:
-        # Define player roles
-        gmb_players = {
-            "ILYXOU": "Top",
-            "Goliah": "Jungle", 
-            "iwanan": "Mid",
-            "Marth": "ADC",
-            "Mahonix": "Support"
-        }
+        # Player roles from the roster registry
+        players_by_role = get_roster().players_by_role()
         
         # Role colors for better visual distinction
         role_colors = {
@@ -1650,50 +3232,23 @@ elif page == "Champion Analysis":
         }
         
         # Collect champion data for GMB players
+        picks = store["participants"][store["participants"]["champion"].notna()]
+        gmb_picks = picks[picks["role"].notna()]
+        opponent_picks = picks[~picks["is_gmb"]]
+        
         gmb_champion_data = {}
-        opponent_champion_data = {}
+        gmb_records = gmb_picks.groupby(["role", "champion"], observed=True, sort=False)["win"].agg(["size", "sum"])
+        for (role, champion), record in gmb_records.iterrows():
+            gmb_champion_data.setdefault(role, {})[champion] = {"wins": int(record["sum"]), "games": int(record["size"])}
         
-        for game in games:
-            game_win = game.get("win", False)
-            gmb_team_id = game.get("gmb_team_id")
-            
-            if "final_items" in game:
-                for player, item_data in game["final_items"].items():
-                    champion = item_data.get("champion", "Unknown")
-                    team_id = item_data.get("team_id")
-                    
-                    # Check if this is a GMB player
-                    gmb_player = None
-                    for gmb_name, role in gmb_players.items():
-                        if player.upper() == gmb_name.upper() or player == gmb_name:
-                            gmb_player = gmb_name
-                            break
-                    
-                    if gmb_player and team_id == gmb_team_id:
-                        # GMB player
-                        role = gmb_players[gmb_player]
-                        if role not in gmb_champion_data:
-                            gmb_champion_data[role] = {}
-                        if champion not in gmb_champion_data[role]:
-                            gmb_champion_data[role][champion] = {"wins": 0, "games": 0}
-                        
-                        gmb_champion_data[role][champion]["games"] += 1
-                        if game_win:
-                            gmb_champion_data[role][champion]["wins"] += 1
-                    
-                    elif team_id != gmb_team_id:
-                        # Opponent player
-                        if "Opponent" not in opponent_champion_data:
-                            opponent_champion_data["Opponent"] = {}
-                        if champion not in opponent_champion_data["Opponent"]:
-                            opponent_champion_data["Opponent"][champion] = {"wins": 0, "games": 0}
-                        
-                        opponent_champion_data["Opponent"][champion]["games"] += 1
-                        if not game_win:  # Opponent wins when GMB loses
-                            opponent_champion_data["Opponent"][champion]["wins"] += 1
+        # Participant "win" is the opponent's result for opponent rows
+        opponent_champion_data = {}
+        opponent_records = opponent_picks.groupby("champion", observed=True, sort=False)["win"].agg(["size", "sum"])
+        for champion, record in opponent_records.iterrows():
+            opponent_champion_data.setdefault("Opponent", {})[champion] = {"wins": int(record["sum"]), "games": int(record["size"])}
         
         # Create tabs for different views
-        tab1, tab2 = st.tabs(["🏆 GMB Champions", "⚔️ Opponent Analysis"])
+        tab1, tab2, tab3 = st.tabs(["🏆 GMB Champions", "⚔️ Opponent Analysis", "🛒 Item Builds"])
         
         with tab1:
             st.markdown("""
@@ -1706,8 +3261,8 @@ elif page == "Champion Analysis":
             """, unsafe_allow_html=True)
             
             # Create role sections
-            for role in ["Top", "Jungle", "Mid", "ADC", "Support"]:
-                player_name = [k for k, v in gmb_players.items() if v == role][0]
+            for role in ROLES:
+                player_name = ", ".join(players_by_role.get(role, [])) or "—"
                 role_color = role_colors.get(role, "#3b82f6")
                 
                 if role in gmb_champion_data and gmb_champion_data[role]:
@@ -1748,27 +3303,27 @@ elif page == "Champion Analysis":
                         if len(role_data) == 1:
                             cols = st.columns([1, 2, 1])
                             with cols[1]:
-                                create_champion_card(role_data[0], role_color, champion_data, champ_mapping, ddragon_version)
+                                create_champion_card(role_data[0], role_color, champion_data, champ_resolver, ddragon_version)
                         elif len(role_data) == 2:
                             cols = st.columns([2, 1, 2])
                             with cols[0]:
-                                create_champion_card(role_data[0], role_color, champion_data, champ_mapping, ddragon_version)
+                                create_champion_card(role_data[0], role_color, champion_data, champ_resolver, ddragon_version)
                             with cols[1]:
                                 st.markdown("", unsafe_allow_html=True)  # Separator space
                             with cols[2]:
-                                create_champion_card(role_data[1], role_color, champion_data, champ_mapping, ddragon_version)
+                                create_champion_card(role_data[1], role_color, champion_data, champ_resolver, ddragon_version)
                         elif len(role_data) == 3:
                             cols = st.columns([3, 1, 3, 1, 3])
                             with cols[0]:
-                                create_champion_card(role_data[0], role_color, champion_data, champ_mapping, ddragon_version)
+                                create_champion_card(role_data[0], role_color, champion_data, champ_resolver, ddragon_version)
                             with cols[1]:
                                 st.markdown('<div style="border-left: 2px solid #475569; height: 400px; margin: 2rem 0;"></div>', unsafe_allow_html=True)
                             with cols[2]:
-                                create_champion_card(role_data[1], role_color, champion_data, champ_mapping, ddragon_version)
+                                create_champion_card(role_data[1], role_color, champion_data, champ_resolver, ddragon_version)
                             with cols[3]:
                                 st.markdown('<div style="border-left: 2px solid #475569; height: 400px; margin: 2rem 0;"></div>', unsafe_allow_html=True)
                             with cols[4]:
-                                create_champion_card(role_data[2], role_color, champion_data, champ_mapping, ddragon_version)
+                                create_champion_card(role_data[2], role_color, champion_data, champ_resolver, ddragon_version)
                     else:
                         # Many champions - display in grid with metrics + detailed table
                         # Top 3 champions as cards with separators
@@ -1776,7 +3331,7 @@ elif page == "Champion Analysis":
                         for i in range(min(3, len(role_data))):
                             col_index = i * 2  # 0, 2, 4
                             with cols[col_index]:
-                                create_champion_card(role_data[i], role_color, champion_data, champ_mapping, ddragon_version)
+                                create_champion_card(role_data[i], role_color, champion_data, champ_resolver, ddragon_version)
                             # Add separator after first two champions
                             if i < 2:
                                 with cols[col_index + 1]:
@@ -1788,7 +3343,7 @@ elif page == "Champion Analysis":
                                 # Create detailed champion grid
                                 remaining_champs = role_data[3:]
                                 for champ_data in remaining_champs:
-                                    create_champion_row(champ_data, role_color, champion_data, champ_mapping, ddragon_version)
+                                    create_champion_row(champ_data, role_color, champion_data, champ_resolver, ddragon_version)
                 else:
                     # No data for this role
                     st.markdown(f"""
@@ -1862,7 +3417,7 @@ elif page == "Champion Analysis":
                         </h4>
                         """, unsafe_allow_html=True)
                         
-                        create_threat_layout_with_separators(high_threat, "#ef4444", champion_data, champ_mapping, ddragon_version)
+                        create_threat_layout_with_separators(high_threat, "#ef4444", champion_data, champ_resolver, ddragon_version)
                     
                     # Medium threat champions  
                     if medium_threat:
@@ -1872,7 +3427,7 @@ elif page == "Champion Analysis":
                         </h4>
                         """, unsafe_allow_html=True)
                         
-                        create_threat_layout_with_separators(medium_threat, "#f59e0b", champion_data, champ_mapping, ddragon_version)
+                        create_threat_layout_with_separators(medium_threat, "#f59e0b", champion_data, champ_resolver, ddragon_version)
                     
                     # Low threat champions
                     if low_threat:
@@ -1882,18 +3437,40 @@ elif page == "Champion Analysis":
                         </h4>
                         """, unsafe_allow_html=True)
                         
-                        create_threat_layout_with_separators(low_threat, "#10b981", champion_data, champ_mapping, ddragon_version)
+                        create_threat_layout_with_separators(low_threat, "#10b981", champion_data, champ_resolver, ddragon_version)
                     
                     # Detailed table for all opponents
                     with st.expander("📊 Complete Opponent Champion Statistics", expanded=False):
-                        create_detailed_opponent_table(opponent_data, champion_data, champ_mapping, ddragon_version)
+                        create_detailed_opponent_table(opponent_data, champion_data, champ_resolver, ddragon_version)
             else:
                 st.info("No opponent champion data available")
+        
+        with tab3:
+            frequency = get_item_tables()["frequency"]
+            if frequency.empty:
+                st.info("No item data available")
+            else:
+                build_champion = st.selectbox("Champion", frequency["champion"].astype(str).unique(), key="item_build_champion")
+                builds = frequency[frequency["champion"] == build_champion]
+                st.dataframe(
+                    pd.DataFrame({
+                        "Item": builds["item"],
+                        "Games": builds["games"],
+                        "Built In": (builds["frequency"] * 100).round(1).astype(str) + "%",
+                        "Gold": builds["gold"],
+                    }),
+                    use_container_width=True,
+                    hide_index=True,
+                )
 
 # Logout button at the end of the application
 st.markdown("---")
 st.markdown('<div style="text-align: center; padding: 2rem 0;">', unsafe_allow_html=True)
 if st.button("🔓 Logout", key="logout_button"):
     st.session_state.authenticated = False
+    st.session_state.is_admin = False
     st.rerun()
-st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
+st.markdown('</div>', unsafe_allow_html=True)
+
+if render_time is not None:
+    render_time.caption(f"Last render: {(time.perf_counter() - render_started) * 1000:.0f} ms")
\ No newline at end of file
@@ -0,0 +1,348 @@
+"""Synced copies of the game views, their SQLite snapshot and the watcher keeping them current.
+
+Pure pymongo and stdlib code, shared by ``app.py`` (which builds one
+instance of each per process) and the tests, which drive it with mongomock.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from types import MappingProxyType
+
+import bson
+import pymongo
+from bson import ObjectId
+
+
+def project(doc, fields):
+    """Inclusion projection (dotted paths allowed) applied to a document in memory, like Mongo's"""
+    projected, nested = {}, {}
+    for path in fields:
+        head, _, rest = path.partition(".")
+        if rest:
+            nested.setdefault(head, []).append(rest)
+        elif head in doc:
+            projected[head] = doc[head]
+    for head, rests in nested.items():
+        value = doc.get(head)
+        if head in projected or value is None:
+            continue
+        if isinstance(value, list):
+            projected[head] = [project(item, rests) for item in value if isinstance(item, dict)]
+        elif isinstance(value, dict):
+            projected[head] = project(value, rests)
+    return projected
+
+
+def freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples.
+
+    Read-only mappings cannot be pickled, so frozen values are shared through
+    ``st.cache_resource`` only; ``st.cache_data`` functions return raw documents.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class Snapshot:
+    """SQLite file holding the last synced game views and players as BSON, keyed by name and _id"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS docs (name TEXT, id BLOB, doc BLOB, PRIMARY KEY (name, id))")
+
+    @staticmethod
+    def _key(doc_id):
+        return bson.encode({"_id": doc_id})
+
+    def load(self, name):
+        with self.lock:
+            rows = self.conn.execute("SELECT doc FROM docs WHERE name = ?", (name,)).fetchall()
+        return [bson.decode(row[0]) for row in rows]
+
+    def save(self, name, docs):
+        rows = [(name, self._key(doc.get("_id")), bson.encode(doc)) for doc in docs]
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO docs (name, id, doc) VALUES (?, ?, ?)", rows)
+
+    def delete(self, name, doc_ids):
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM docs WHERE name = ? AND id = ?", [(name, self._key(i)) for i in doc_ids])
+
+    def replace(self, name, docs):
+        rows = [(name, self._key(doc.get("_id")), bson.encode(doc)) for doc in docs]
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM docs WHERE name = ?", (name,))
+            self.conn.executemany("INSERT OR REPLACE INTO docs (name, id, doc) VALUES (?, ?, ?)", rows)
+
+    def retain(self, prefix, names):
+        """Drop every entry whose name starts with prefix but is not one of names"""
+        names = list(names)
+        placeholders = ", ".join("?" * len(names)) or "NULL"
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"DELETE FROM docs WHERE substr(name, 1, ?) = ? AND name NOT IN ({placeholders})",
+                (len(prefix), prefix, *names),
+            )
+
+    def clear(self, name):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM docs WHERE name = ?", (name,))
+
+
+class GameSync:
+    """In-process copy of one projected game view, kept current with delta queries.
+
+    The first refresh loads the whole view; later refreshes only fetch games
+    inserted after the ``_id`` watermark (or on/after the ``date`` watermark when
+    ids are not ObjectIds) and games whose ``updated_at`` moved past the last one
+    seen, then merge them by ``_id``. Every change is written through to the
+    snapshot (a full load replaces it), and ``restore`` starts the view from
+    it without touching Mongo; ``prune`` then drops games deleted since.
+    """
+
+    def __init__(self, collection, projection, snapshot=None, name=None):
+        self.collection = collection
+        self.projection = {**projection, "updated_at": 1}
+        self.snapshot = snapshot
+        self.name = name
+        self.lock = threading.Lock()
+        self._clear()
+
+    def restore(self):
+        """Load the view from the snapshot; the watcher then delta-refreshes it in the background"""
+        docs = self.snapshot.load(self.name) if self.snapshot else []
+        with self.lock:
+            if docs:
+                self.merge(docs, persist=False)
+                self.loaded = True
+        return bool(docs)
+
+    def _clear(self):
+        self.docs = {}
+        self.games = ()
+        self.loaded = False
+        self.last_id = None
+        self.last_date = None
+        self.last_updated = None
+
+    def delta_query(self):
+        if not self.docs:
+            return {}
+        if self.last_id is not None:
+            clauses = [{"_id": {"$gt": self.last_id}}]
+        else:
+            clauses = [{"date": {"$gte": self.last_date}}]
+        if self.last_updated is not None:
+            clauses.append({"updated_at": {"$gt": self.last_updated}})
+        else:
+            clauses.append({"updated_at": {"$exists": True}})
+        return {"$or": clauses}
+
+    def _sort(self):
+        # Swap in a new tuple so readers holding the previous one are unaffected
+        self.games = tuple(sorted(self.docs.values(), key=lambda g: g.get("date") or "", reverse=True))
+
+    def merge(self, docs, persist=True):
+        """Merge fetched documents by _id and advance the watermarks.
+
+        Documents are frozen on the way in, so every session can read the
+        shared view without copying it.
+        """
+        changed = []
+        for doc in docs:
+            doc = freeze(doc)
+            doc_id = doc.get("_id")
+            if self.docs.get(doc_id) == doc:
+                continue
+            self.docs[doc_id] = doc
+            changed.append(doc)
+            if isinstance(doc_id, ObjectId) and (self.last_id is None or doc_id > self.last_id):
+                self.last_id = doc_id
+            if doc.get("date") and (self.last_date is None or doc["date"] > self.last_date):
+                self.last_date = doc["date"]
+            if doc.get("updated_at") and (self.last_updated is None or doc["updated_at"] > self.last_updated):
+                self.last_updated = doc["updated_at"]
+        if changed:
+            self._sort()
+            if persist and self.snapshot:
+                self.snapshot.save(self.name, changed)
+        return bool(changed)
+
+    def refresh(self):
+        """Fetch and merge games changed since the last sync. Returns True if the view changed."""
+        with self.lock:
+            if self.docs:
+                changed = self.merge(self.collection.find(self.delta_query(), self.projection))
+            else:
+                # A full load replaces the snapshot, dropping games deleted since it was written
+                changed = self.merge(self.collection.find({}, self.projection), persist=False)
+                if self.snapshot:
+                    self.snapshot.replace(self.name, self.docs.values())
+            self.loaded = True
+            return changed
+
+    def prune(self, live_ids):
+        """Drop games whose _id is no longer in the collection. Returns True if any were dropped."""
+        with self.lock:
+            removed = [doc_id for doc_id in self.docs if doc_id not in live_ids]
+            if not removed:
+                return False
+            # Build the pruned view first, then swap it in, so readers never see a partial one
+            self.docs = {doc_id: doc for doc_id, doc in self.docs.items() if doc_id in live_ids}
+            self._sort()
+            if self.snapshot:
+                self.snapshot.delete(self.name, removed)
+            return True
+
+    def poll(self, live_ids):
+        """Delta refresh that also drops deleted games, given the current set of _ids"""
+        pruned = self.prune(live_ids)
+        return self.refresh() or pruned
+
+    def apply_change(self, change):
+        """Patch the view from a change stream event. Returns True if the view changed."""
+        doc_id = change.get("documentKey", {}).get("_id")
+        with self.lock:
+            if not self.loaded:
+                return False
+            if change.get("operationType") == "delete":
+                if self.docs.pop(doc_id, None) is None:
+                    return False
+                self._sort()
+                if self.snapshot:
+                    self.snapshot.delete(self.name, [doc_id])
+                return True
+            # The stream looks the document up already; only a missing lookup needs a query
+            full_document = change.get("fullDocument")
+            if full_document is not None:
+                doc = {"_id": doc_id, **project(full_document, self.projection)}
+            else:
+                doc = self.collection.find_one({"_id": doc_id}, self.projection)
+            return self.merge([doc]) if doc else False
+
+
+# Seconds between two checks when change streams are unavailable, and the cap on retry backoff
+WATCH_POLL_INTERVAL = 30
+WATCH_MAX_BACKOFF = 300
+
+
+logger = logging.getLogger("gmb.watcher")
+
+
+def supports_change_streams(collection):
+    """True when the collection is a pymongo collection on a replica set or sharded cluster"""
+    if not isinstance(collection, pymongo.collection.Collection):
+        # Wrappers such as the app's instrumented collection keep the driver's one in .collection
+        collection = getattr(collection, "collection", None)
+    if not isinstance(collection, pymongo.collection.Collection):
+        return False
+    hello = collection.database.client.admin.command("hello")
+    return "setName" in hello or hello.get("msg") == "isdbgrid"
+
+
+class DataWatcher:
+    """Background watcher that bumps a data version when games or players change.
+
+    Each collection is followed through a MongoDB change stream when the
+    deployment supports them (``supports_change_streams``, or the server
+    rejecting the stream); otherwise it is polled every ``poll_interval``
+    seconds. Game changes are patched into the synced game views, player
+    changes only bump the version. Any error is logged and retried with
+    exponential backoff, so the thread outlives network and driver failures.
+    """
+
+    def __init__(self, games_collection, players_collection, game_syncs, poll_interval=WATCH_POLL_INTERVAL, players=None):
+        self.collections = {"games": games_collection, "players": players_collection}
+        self.game_syncs = game_syncs
+        self.poll_interval = poll_interval
+        self.versions = {"games": 0, "players": 0}
+        self.modes = {"games": "starting", "players": "starting"}
+        self.change_streams = {"games": None, "players": None}  # None until checked
+        self.last_players = players
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def start(self):
+        for name in self.collections:
+            threading.Thread(target=self._run, args=(name,), name=f"watch-{name}", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def bump(self, name):
+        with self.lock:
+            self.versions[name] += 1
+
+    def handle_change(self, name, change):
+        if name == "players":
+            return True
+        changed = False
+        for sync in self.game_syncs.values():
+            changed = sync.apply_change(change) or changed
+        return changed
+
+    def poll(self, name):
+        if name == "players":
+            players = list(self.collections["players"].find())
+            changed = self.last_players is not None and players != self.last_players
+            self.last_players = players
+            return changed
+        syncs = [sync for sync in self.game_syncs.values() if sync.loaded]
+        if not syncs:
+            return False
+        # One _id scan serves every view: a delete followed by an insert keeps the count but not the ids
+        live_ids = {doc["_id"] for doc in self.collections["games"].find({}, {"_id": 1})}
+        changed = False
+        for sync in syncs:
+            changed = sync.poll(live_ids) or changed
+        return changed
+
+    def watchable(self, name):
+        if self.change_streams[name] is None:
+            self.change_streams[name] = supports_change_streams(self.collections[name])
+        return self.change_streams[name]
+
+    def stream(self, name):
+        """Follow the collection's change stream until stopped or the stream ends"""
+        try:
+            stream = self.collections[name].watch(full_document="updateLookup")
+        except pymongo.errors.OperationFailure:
+            # Rejected by the server (no replica set, or not permitted): poll from now on
+            self.change_streams[name] = False
+            return
+        with stream:
+            self.modes[name] = "change stream"
+            for change in stream:
+                if self.handle_change(name, change):
+                    self.bump(name)
+                if self.stopped.is_set():
+                    return
+
+    def _run(self, name):
+        failures = 0
+        while not self.stopped.is_set():
+            try:
+                # Catch up on anything missed before (re)opening the stream or between two polls
+                if self.poll(name):
+                    self.bump(name)
+                if self.watchable(name):
+                    self.stream(name)
+                else:
+                    self.modes[name] = "polling"
+                    self.stopped.wait(self.poll_interval)
+                failures = 0
+            except Exception:
+                failures += 1
+                self.modes[name] = "reconnecting"
+                backoff = min(self.poll_interval * 2 ** (failures - 1), WATCH_MAX_BACKOFF)
+                logger.exception("Watching %s failed (attempt %d), retrying in %gs", name, failures, backoff)
+                self.stopped.wait(backoff)
@@ -0,0 +1,124 @@
+"""Team Stats figures, computed either from the game store or by a MongoDB pipeline.
+
+Both paths read game documents the way MongoDB does, so they agree on any
+input: ``$cond`` truthiness for ``win`` and ``first`` flags, and ``$sum``
+counting only numbers (null, missing, strings and booleans add 0).
+"""
+
+TEAM_STATS_FIELDS = [
+    "total_games", "wins", "blue_games", "blue_wins", "red_games", "red_wins", "dragons_total", "barons_total",
+    "first_dragon_games", "first_dragon_wins", "first_baron_games", "first_baron_wins",
+    "first_herald_games", "first_herald_wins",
+]
+FIRST_OBJECTIVES = (("dragon", "dragon"), ("baron", "baron"), ("herald", "riftHerald"))
+
+
+def mongo_truthy(value):
+    """Truthiness as ``$cond`` sees it: only false, null, missing and numeric zero are false"""
+    if value is None or value is False:
+        return False
+    return not (isinstance(value, (int, float)) and value == 0)
+
+
+def mongo_number(value):
+    """Value as ``$sum`` counts it: numbers as they are, anything else as 0"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return 0
+
+
+def game_side(game):
+    """GMB side of a game, upper-cased ("" when unknown)"""
+    side = game.get("gmb_side")
+    return side.upper() if isinstance(side, str) else ""
+
+
+def game_objective_rows(game_id, game, win):
+    """One row per team and objective, for games whose GMB side is blue or red"""
+    gmb_side = game.get("gmb_side")
+    teams = game.get("objectives")
+    if gmb_side not in ("blue", "red") or not isinstance(teams, dict):
+        return []
+    enemy_side = "red" if gmb_side == "blue" else "blue"
+    rows = []
+    for team, side in (("GMB", gmb_side), ("Opponent", enemy_side)):
+        team_data = teams.get(f"{side}_team")
+        objectives = team_data.get("objectives") if isinstance(team_data, dict) else None
+        if not isinstance(objectives, dict):
+            continue
+        for objective, values in objectives.items():
+            if not isinstance(values, dict):
+                continue
+            rows.append({
+                "game_id": game_id,
+                "team": team,
+                "objective": objective,
+                "kills": mongo_number(values.get("kills")),
+                "first": mongo_truthy(values.get("first")),
+                "win": win,
+            })
+    return rows
+
+
+def compute_team_stats(store):
+    """Team record, side records and objective conversion from the game store"""
+    games = store["games"]
+    side_records = games.groupby("side", observed=True)["win"].agg(["size", "sum"])
+    gmb_objectives = store["objectives"][store["objectives"]["team"] == "GMB"]
+    objective_kills = gmb_objectives.groupby("objective", observed=True)["kills"].sum()
+    firsts = gmb_objectives.loc[gmb_objectives["first"].astype(bool)].groupby("objective", observed=True)["win"].agg(["size", "sum"])
+    stats = {
+        "total_games": len(games),
+        "wins": int(games["win"].sum()),
+        "dragons_total": int(objective_kills.get("dragon", 0)),
+        "barons_total": int(objective_kills.get("baron", 0)),
+    }
+    for side in ("blue", "red"):
+        stats[f"{side}_games"] = int(side_records["size"].get(side.upper(), 0))
+        stats[f"{side}_wins"] = int(side_records["sum"].get(side.upper(), 0))
+    for name, objective in FIRST_OBJECTIVES:
+        stats[f"first_{name}_games"] = int(firsts["size"].get(objective, 0))
+        stats[f"first_{name}_wins"] = int(firsts["sum"].get(objective, 0))
+    return stats
+
+
+def team_stats_pipeline():
+    """Aggregation computing the same figures as compute_team_stats in a single $group"""
+    win = {"$cond": ["$win", 1, 0]}
+    side = {"$toUpper": {"$ifNull": ["$gmb_side", ""]}}
+    group = {
+        "_id": None,
+        "total_games": {"$sum": 1},
+        "wins": {"$sum": "$win"},
+        "dragons_total": {"$sum": "$gmb.dragon.kills"},
+        "barons_total": {"$sum": "$gmb.baron.kills"},
+    }
+    for name in ("blue", "red"):
+        group[f"{name}_games"] = {"$sum": {"$cond": [{"$eq": ["$side", name.upper()]}, 1, 0]}}
+        group[f"{name}_wins"] = {"$sum": {"$cond": [{"$eq": ["$side", name.upper()]}, "$win", 0]}}
+    for name, objective in FIRST_OBJECTIVES:
+        first = {"$ifNull": [f"$gmb.{objective}.first", False]}
+        group[f"first_{name}_games"] = {"$sum": {"$cond": [first, 1, 0]}}
+        group[f"first_{name}_wins"] = {"$sum": {"$cond": [first, "$win", 0]}}
+    return [
+        {"$project": {
+            "win": win,
+            "side": side,
+            "gmb": {"$switch": {
+                "branches": [
+                    {"case": {"$eq": ["$gmb_side", "blue"]}, "then": "$objectives.blue_team.objectives"},
+                    {"case": {"$eq": ["$gmb_side", "red"]}, "then": "$objectives.red_team.objectives"},
+                ],
+                "default": None,
+            }},
+        }},
+        {"$group": group},
+        {"$project": {"_id": 0}},
+    ]
+
+
+def team_stats_from_result(result):
+    """Pipeline output as a complete stats dict (an empty collection yields all zeros)"""
+    stats = dict.fromkeys(TEAM_STATS_FIELDS, 0)
+    stats.update({field: int(value) for field, value in (result or {}).items()})
+    return stats
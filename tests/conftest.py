@@ -0,0 +1,5 @@
+import os
+import sys
+
+# app.py is a Streamlit script, not a package: make its sibling modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
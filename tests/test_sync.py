@@ -0,0 +1,139 @@
+import datetime
+
+import mongomock
+import pytest
+from bson import ObjectId
+
+from data_sync import DataWatcher, GameSync, Snapshot, supports_change_streams
+
+PROJECTION = {"date": 1, "opponent_team.name": 1, "win": 1}
+
+
+def game(date, opponent="Karmine", win=True, **fields):
+    return {"_id": ObjectId(), "date": date, "opponent_team": {"name": opponent, "tag": "KC"}, "win": win,
+            "player_data": {"ILYXOU": {"kda": "1/2/3"}}, **fields}
+
+
+@pytest.fixture
+def games():
+    collection = mongomock.MongoClient().db.GMB_Games
+    collection.insert_many([game("2024-03-01"), game("2024-03-02", "Solary", False)])
+    return collection
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    return Snapshot(str(tmp_path / "snapshot.sqlite3"))
+
+
+def opponents(sync):
+    return [doc["opponent_team"]["name"] for doc in sync.games]
+
+
+class Unreachable:
+    """Stand-in collection for a restore that must not query MongoDB"""
+
+    def find(self, *args, **kwargs):
+        raise AssertionError("restore queried the collection")
+
+    find_one = find
+
+
+def test_full_load_applies_the_projection(games):
+    sync = GameSync(games, PROJECTION)
+    assert sync.refresh()
+    assert sync.loaded
+    assert opponents(sync) == ["Solary", "Karmine"]
+    assert all("player_data" not in doc and "tag" not in doc["opponent_team"] for doc in sync.games)
+
+
+def test_delta_refresh_picks_up_an_insert(games):
+    sync = GameSync(games, PROJECTION)
+    sync.refresh()
+    assert not sync.refresh()
+    games.insert_one(game("2024-03-03", "Vitality Bee"))
+    assert sync.refresh()
+    assert opponents(sync) == ["Vitality Bee", "Solary", "Karmine"]
+
+
+def test_delta_refresh_picks_up_an_updated_at_change(games):
+    sync = GameSync(games, PROJECTION)
+    sync.refresh()
+    games.update_one({"date": "2024-03-01"},
+                     {"$set": {"win": False, "updated_at": datetime.datetime(2024, 3, 5)}})
+    assert sync.refresh()
+    assert [doc["win"] for doc in sync.games] == [False, False]
+    assert sync.last_updated == datetime.datetime(2024, 3, 5)
+    # Only documents updated after the watermark are fetched again
+    assert not sync.refresh()
+
+
+def test_poll_drops_a_deleted_game(games):
+    sync = GameSync(games, PROJECTION)
+    sync.refresh()
+    watcher = DataWatcher(games, games.database.GMB_Players, {"summary": sync})
+    games.delete_one({"date": "2024-03-02"})
+    assert watcher.poll("games")
+    assert opponents(sync) == ["Karmine"]
+    assert not watcher.poll("games")
+
+
+def test_poll_sees_a_delete_followed_by_an_insert(games):
+    sync = GameSync(games, PROJECTION)
+    sync.refresh()
+    watcher = DataWatcher(games, games.database.GMB_Players, {"summary": sync})
+    games.delete_one({"date": "2024-03-02"})
+    games.insert_one(game("2024-03-04", "Solary"))
+    assert watcher.poll("games")
+    assert [doc["date"] for doc in sync.games] == ["2024-03-04", "2024-03-01"]
+
+
+def test_restore_from_the_snapshot(games, snapshot):
+    sync = GameSync(games, PROJECTION, snapshot, "games:summary")
+    sync.refresh()
+    games.insert_one(game("2024-03-03", "Vitality Bee"))
+    sync.refresh()
+
+    restored = GameSync(Unreachable(), PROJECTION, snapshot, "games:summary")
+    assert restored.restore()
+    assert restored.loaded
+    assert restored.games == sync.games
+    assert restored.last_id == sync.last_id
+
+
+def test_restore_then_poll_prunes_games_deleted_since(games, snapshot):
+    GameSync(games, PROJECTION, snapshot, "games:summary").refresh()
+    games.delete_one({"date": "2024-03-01"})
+
+    sync = GameSync(games, PROJECTION, snapshot, "games:summary")
+    sync.restore()
+    assert sync.poll({doc["_id"] for doc in games.find({}, {"_id": 1})})
+    assert opponents(sync) == ["Solary"]
+    assert [doc["opponent_team"]["name"] for doc in snapshot.load("games:summary")] == ["Solary"]
+
+
+def test_insert_change_event_uses_the_full_document(games, snapshot):
+    sync = GameSync(games, PROJECTION, snapshot, "games:summary")
+    sync.refresh()
+    inserted = game("2024-03-03", "Vitality Bee")
+    sync.collection = Unreachable()  # the event carries the document: no lookup
+    assert sync.apply_change({"operationType": "insert", "documentKey": {"_id": inserted["_id"]},
+                              "fullDocument": inserted})
+    assert opponents(sync) == ["Vitality Bee", "Solary", "Karmine"]
+    assert sync.docs[inserted["_id"]] == {"_id": inserted["_id"], "date": "2024-03-03",
+                                          "opponent_team": {"name": "Vitality Bee"}, "win": True}
+    assert sync.last_id == inserted["_id"]
+    assert len(snapshot.load("games:summary")) == 3
+
+
+def test_delete_change_event(games):
+    sync = GameSync(games, PROJECTION)
+    sync.refresh()
+    doc_id = games.find_one({"date": "2024-03-01"})["_id"]
+    assert sync.apply_change({"operationType": "delete", "documentKey": {"_id": doc_id}})
+    assert opponents(sync) == ["Solary"]
+    assert not sync.apply_change({"operationType": "delete", "documentKey": {"_id": doc_id}})
+
+
+def test_mongomock_is_polled():
+    assert not supports_change_streams(mongomock.MongoClient().db.GMB_Games)
@@ -0,0 +1,81 @@
+import mongomock
+import pandas as pd
+import pytest
+
+from team_stats import (
+    TEAM_STATS_FIELDS, compute_team_stats, game_objective_rows, game_side, mongo_truthy, team_stats_from_result,
+    team_stats_pipeline,
+)
+
+
+def team(dragon=None, baron=None, herald=None):
+    objectives = {}
+    for name, values in (("dragon", dragon), ("baron", baron), ("riftHerald", herald)):
+        if values is not None:
+            objectives[name] = values
+    return {"objectives": objectives}
+
+
+GAMES = [
+    {"win": True, "gmb_side": "blue",
+     "objectives": {"blue_team": team({"kills": 3, "first": True}, {"kills": 1, "first": True}, {"kills": 1}),
+                    "red_team": team({"kills": 1}, {"kills": 0}, {"kills": 1, "first": True})}},
+    {"win": False, "gmb_side": "red",
+     "objectives": {"blue_team": team({"kills": 2, "first": True}),
+                    "red_team": team({"kills": 2}, {"kills": 1, "first": True}, {"kills": 1, "first": True})}},
+    # Truthiness as $cond sees it: 1 and "" are true, 0 and null are false
+    {"win": 1, "gmb_side": "red", "objectives": {"red_team": team({"kills": 1, "first": 1})}},
+    {"win": "", "gmb_side": "blue", "objectives": {"blue_team": team({"kills": 2, "first": "yes"})}},
+    {"win": 0, "gmb_side": "blue", "objectives": {"blue_team": team({"kills": 1, "first": 0})}},
+    {"win": None, "gmb_side": "red", "objectives": {"red_team": team(herald={"kills": 1, "first": None})}},
+    # $sum only counts numbers: null, missing, strings and booleans add nothing
+    {"win": True, "gmb_side": "blue",
+     "objectives": {"blue_team": team({"kills": None, "first": True}, {"kills": "2"}, {"first": True})}},
+    # (Boolean kills are left out: MongoDB's $sum skips them, mongomock's counts them as 1)
+    {"win": True, "gmb_side": "red", "objectives": {"red_team": team({"first": False}, {"kills": 2.0})}},
+    # Unknown or odd sides and objective shapes
+    {"win": True, "gmb_side": "BLUE", "objectives": {"blue_team": team({"kills": 4, "first": True})}},
+    {"win": True},
+    {"gmb_side": None, "objectives": None},
+    {"win": False, "gmb_side": "blue", "objectives": {"blue_team": {"objectives": ["dragon"]}}},
+    {"win": False, "gmb_side": "red", "objectives": {"red_team": team("dragon", {"kills": 1})}},
+]
+
+
+def store_from(games):
+    """The games and objectives frames, built the way build_game_store builds them"""
+    game_rows, objective_rows = [], []
+    for game_id, game in enumerate(games):
+        win = mongo_truthy(game.get("win"))
+        game_rows.append({"game_id": str(game_id), "win": win, "side": game_side(game)})
+        objective_rows.extend(game_objective_rows(str(game_id), game, win))
+    games_frame = pd.DataFrame(game_rows, columns=["game_id", "win", "side"])
+    objectives = pd.DataFrame(objective_rows, columns=["game_id", "team", "objective", "kills", "first", "win"])
+    return {
+        "games": games_frame.astype({"side": "category"}),
+        "objectives": objectives.astype({"team": "category", "objective": "category"}),
+    }
+
+
+def aggregate(games):
+    collection = mongomock.MongoClient().db.GMB_Games
+    if games:
+        collection.insert_many([dict(game) for game in games])
+    return team_stats_from_result(next(collection.aggregate(team_stats_pipeline()), None))
+
+
+@pytest.mark.parametrize("games", [GAMES, GAMES[:2], GAMES[2:], []], ids=["all", "plain", "edge-cases", "empty"])
+def test_server_and_local_paths_agree(games):
+    assert aggregate(games) == compute_team_stats(store_from(games))
+
+
+def test_figures():
+    stats = compute_team_stats(store_from(GAMES[:2]))
+    assert set(stats) == set(TEAM_STATS_FIELDS)
+    assert stats["total_games"] == 2
+    assert stats["wins"] == 1
+    assert (stats["blue_games"], stats["blue_wins"], stats["red_games"], stats["red_wins"]) == (1, 1, 1, 0)
+    assert (stats["dragons_total"], stats["barons_total"]) == (5, 2)
+    assert (stats["first_dragon_games"], stats["first_dragon_wins"]) == (1, 1)
+    assert (stats["first_baron_games"], stats["first_baron_wins"]) == (2, 1)
+    assert (stats["first_herald_games"], stats["first_herald_wins"]) == (1, 0)